@@ -22,6 +22,7 @@ class Metamaterial:
         self.vertices = None
         self.edges = None
         self.faces = None
+        self.topology = None
         
         # Система колец
         self.ring_system = RingSystem()
@@ -62,8 +63,15 @@ class Metamaterial:
             if hasattr(self, key):
                 params_dict[key] = getattr(self, key)
         
-        # Расчет геометрии
-        self.vertices, self.edges, self.faces = self.structure.calculate_geometry(**params_dict)
+        # Геометрия: из топологии без дублирования, если тип структуры ее
+        # поддерживает (списки с повторами по ячейкам не строятся)
+        if hasattr(self.structure, "calculate_topology"):
+            self.topology = self.structure.calculate_topology(**params_dict)
+            self.vertices = self.topology.vertex_positions()
+            self.edges = self.topology.edges
+            self.faces = self.topology.faces
+        else:
+            self.vertices, self.edges, self.faces = self.structure.calculate_geometry(**params_dict)
         
         # Расчет конфигураций колец
         positions, orientations, ring_params_list = self.structure.calculate_ring_configurations(**params_dict)
@@ -82,6 +90,25 @@ class Metamaterial:
                 strip_width=ring_data["strip_width"]
             )
     
+    def update_circuit_parameters(self, **kwargs):
+        """
+        Обновить параметры цепи колец (resistance, inductance, capacitance,
+        frequency) без перестроения геометрии. Применяется ко всем кольцам.
+        """
+        for key in kwargs:
+            if key not in ("resistance", "inductance", "capacitance", "frequency"):
+                raise ValueError(f"Параметр {key} требует перестроения материала")
+
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        self.omega = 2 * np.pi * self.frequency
+
+        for ring in self.ring_system.rings:
+            ring.R = self.resistance
+            ring.L = self.inductance
+            ring.C = self.capacitance
+            ring.omega = self.omega
+
     def get_ring_count(self):
         """Количество колец"""
         return len(self.ring_system.rings)
@@ -149,10 +176,15 @@ class Metamaterial:
             radius=radius,
             strip_width=strip_width
         )
+        if self.topology is not None:
+            self.topology.append_ring()
     
     def remove_ring(self, index):
         """Удалить кольцо"""
-        return self.ring_system.remove_ring(index)
+        removed = self.ring_system.remove_ring(index)
+        if removed and self.topology is not None:
+            self.topology.remove_ring(index)
+        return removed
     
     def visualize(self):
         """Визуализация"""
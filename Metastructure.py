@@ -1,5 +1,6 @@
 import numpy as np
 from abc import ABC, abstractmethod
+from Topology import CubicTopology
 
 class MetaStructure(ABC):
     """
@@ -148,6 +149,21 @@ class CubicStructure(MetaStructure):
         
         return vertices, edges, faces
     
+    def calculate_topology(self, **kwargs):
+        """Топология без дублирования ребер и граней, с привязкой колец к местам"""
+        self.validate_parameters(**kwargs)
+        
+        params = self.get_default_parameters()
+        params.update(kwargs)
+        
+        return CubicTopology(
+            params["grid_x"], params["grid_y"], params["grid_z"],
+            rings_on_faces=params["rings_on_faces"],
+            rings_on_edges=params["rings_on_edges"],
+            rings_on_corners=params["rings_on_corners"],
+            spacing=params["cube_size"] * params["unit_size"]
+        )
+    
     def calculate_ring_configurations(self, **kwargs):
         """Расчет конфигураций колец для кубической структуры"""
         self.validate_parameters(**kwargs)
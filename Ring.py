@@ -2,6 +2,7 @@ import numpy as np
 from Solver import MutualInductanceCalculator
 from Solver import ImpedanceMatrixBuilder
 from Solver import ExternalFluxCalculator
+from Solver import packed_indices
 class Ring:
     def __init__(self, position, orientation, R, L, C, omega, radius=0.003, strip_width=0.0005):
         """
@@ -25,24 +26,25 @@ class Ring:
         self.strip_width = strip_width
         self.area = np.pi * radius ** 2
     
-    def build_impedance_matrix(self, ring_system): #TODO сделать норм тело (теплес) 
+    def build_impedance_matrix(self, ring_system, dtype=complex, packed=False): #TODO сделать норм тело (теплес) 
         positions = ring_system.get_positions()
         orientations = ring_system.get_orientations()
         N = len(positions)
         
         mutual_calc = MutualInductanceCalculator(ring_radius=1, strip_width=1)
-        L_matrix = np.zeros((N, N), dtype=float)
         
-        for i in range(N):
-            for j in range(N):
-                if i != j:
-                    L_matrix[i, j] = mutual_calc.mutual_inductance(
-                        positions[i], orientations[i],
-                        positions[j], orientations[j]
-                    )
+        # M[i, j] = M[j, i]: считаем только верхний треугольник
+        i_idx, j_idx = packed_indices(N)
+        M_packed = np.zeros(len(i_idx), dtype=float)
+        for k, (i, j) in enumerate(zip(i_idx, j_idx)):
+            if i != j:
+                M_packed[k] = mutual_calc.mutual_inductance(
+                    positions[i], orientations[i],
+                    positions[j], orientations[j]
+                )
                     
-        impedance_builder = ImpedanceMatrixBuilder(N, self.R, self.L, self.C, self.omega)
-        return impedance_builder.build_impedance_matrix(L_matrix)
+        impedance_builder = ImpedanceMatrixBuilder(N, self.R, self.L, self.C, self.omega, dtype=dtype)
+        return impedance_builder.build_impedance_matrix(M_packed, packed=packed)
         
     def build_external_flux_vector(self, ring_system, B_field_external):
         positions = ring_system.get_positions()
@@ -1,4 +1,6 @@
 import numpy as np
+from Ring import Ring
+from Symmetry import CubicSymmetry
 
 class RingSystem:
     """
@@ -13,7 +15,6 @@ class RingSystem:
     
     def add_ring(self, position, orientation, R, L, C, omega, radius=0.003, strip_width=0.0005):
         """Добавить кольцо"""
-        from Ring import Ring
         ring = Ring(position, orientation, R, L, C, omega, radius, strip_width)
         self.rings.append(ring)
         
@@ -41,6 +42,10 @@ class RingSystem:
         """Получить ориентации всех колец"""
         return self.orientations
     
+    def get_symmetry(self, center=None):
+        """Симметрия системы колец относительно кубической точечной группы"""
+        return CubicSymmetry.from_ring_system(self, center=center)
+    
     def visualize(self, vertices=None, edges=None):
         """Визуализация системы колец"""
         try:
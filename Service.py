@@ -0,0 +1,254 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from Metastructure import CubicStructure
+from Metamaterial import Metamaterial
+from Solver import ExternalFluxCalculator, ImpedanceMatrixBuilder, SymmetricFactorization
+from Sweep import CIRCUIT_PARAMETERS
+
+
+class _Geometry:
+    """Геометрия структуры: материал и матрица M (не зависят от параметров цепи)"""
+
+    def __init__(self, material, M):
+        self.material = material
+        self.M = M
+        self.positions = material.ring_system.get_positions()
+        self.orientations = material.ring_system.get_orientations()
+        # Материал общий для всех частот: параметры цепи меняются под блокировкой
+        self.lock = threading.Lock()
+
+
+class _Entry:
+    """Разложение Z для геометрии при заданных параметрах цепи"""
+
+    def __init__(self, geometry, omega, factorization):
+        self.geometry = geometry
+        self.omega = omega
+        self.factorization = factorization
+        self.pending = []  # (поле B, future)
+        self.flushing = False
+        self.task = None
+        self.hits = 0
+
+
+class SolverService:
+    """
+    Долгоживущий сервис решения на локальном сокете.
+
+    Держит два LRU-кэша ограниченного размера: геометрии (материал и M,
+    ключ без параметров цепи) и LDL^T-разложения Z (ключ - геометрия и
+    параметры цепи). Запрос на другой частоте той же структуры не
+    перестраивает материал и не читает M заново, а только собирает и
+    раскладывает Z. Одновременные запросы к одному разложению
+    объединяются в одно решение с несколькими правыми частями. Сборка,
+    разложение и решение выполняются в пуле потоков (LAPACK отпускает
+    GIL), цикл событий не блокируется.
+
+    Протокол: одна строка JSON на запрос и на ответ.
+
+        {"material": {...}, "field": [Bx, By, Bz], "mutual_inductances": "M.npy"}
+        -> {"status": "ok", "currents_real": [...], "currents_imag": [...],
+            "cached": true, "batch": 3, "time": 0.001}
+    """
+
+    def __init__(self, max_entries=8, batch_window=0.002, workers=None):
+        """
+        Args:
+            max_entries: максимальное число разложений (и геометрий) в кэше
+            batch_window: время накопления запросов в пакет (с)
+            workers: число потоков для сборки и решения
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.max_entries = max_entries
+        self.batch_window = batch_window
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.geometries = OrderedDict()
+        self.entries = OrderedDict()
+        self._building = {}
+        self._defaults = CubicStructure().get_default_parameters()
+
+    def _keys(self, material_params, mutual_inductances):
+        """Ключи геометрии и разложения; параметры цепи - со значениями по умолчанию"""
+        geometry = {key: value for key, value in material_params.items() if key not in CIRCUIT_PARAMETERS}
+        circuit = {key: material_params.get(key, self._defaults[key]) for key in CIRCUIT_PARAMETERS}
+        geometry_key = json.dumps([geometry, mutual_inductances], sort_keys=True)
+        entry_key = json.dumps([geometry_key, circuit], sort_keys=True)
+        return geometry_key, entry_key, circuit
+
+    @staticmethod
+    def _build_geometry(material_params, mutual_inductances):
+        """Построение материала и чтение M (в пуле потоков)"""
+        if mutual_inductances is None:
+            # MutualInductanceCalculator.mutual_inductance пока не реализован
+            raise ValueError("Нужен mutual_inductances: файл .npy с матрицей M")
+        material = Metamaterial(CubicStructure(), **material_params)
+        return _Geometry(material, np.load(mutual_inductances))
+
+    @staticmethod
+    def _build_entry(geometry, circuit):
+        """Сборка и разложение Z при параметрах цепи circuit (в пуле потоков)"""
+        material = geometry.material
+        with geometry.lock:
+            material.update_circuit_parameters(**circuit)
+            R, L, C, omega = material.resistance, material.inductance, material.capacitance, material.omega
+        builder = ImpedanceMatrixBuilder(material.get_ring_count(), R, L, C, omega)
+        Z = builder.build_impedance_matrix(geometry.M, packed=True)
+        return _Entry(geometry, omega, SymmetricFactorization(Z))
+
+    @staticmethod
+    def _solve(entry, fields):
+        """Одно решение для всех правых частей пакета (в пуле потоков)"""
+        geometry = entry.geometry
+        N = len(geometry.positions)
+        flux_calc = ExternalFluxCalculator(geometry.positions, geometry.orientations)
+        V = np.empty((N, len(fields)), dtype=complex)
+        for k, field in enumerate(fields):
+            B = np.broadcast_to(np.asarray(field, dtype=float), (N, 3))
+            # omega разложения, а не колец: материал общий для всех частот
+            V[:, k] = -1j * entry.omega * flux_calc.compute_external_flux(B)
+        return entry.factorization.solve(V)
+
+    async def _cached(self, cache, key, build, *args):
+        """Значение из LRU-кэша cache или построение нового (одно на ключ)"""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            return value, True
+
+        building = self._building.get(key)
+        if building is None:
+            loop = asyncio.get_running_loop()
+            building = loop.run_in_executor(self.executor, build, *args)
+            self._building[key] = building
+            try:
+                value = await building
+            finally:
+                del self._building[key]
+            cache[key] = value
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+            return value, False
+
+        return await asyncio.shield(building), False
+
+    async def _get_entry(self, material_params, mutual_inductances):
+        """Разложение для структуры; геометрия берется из своего кэша"""
+        geometry_key, entry_key, circuit = self._keys(material_params, mutual_inductances)
+        entry = self.entries.get(entry_key)
+        if entry is None:
+            geometry, _ = await self._cached(self.geometries, geometry_key, self._build_geometry,
+                                             material_params, mutual_inductances)
+        else:
+            geometry = entry.geometry
+        entry, cached = await self._cached(self.entries, entry_key, self._build_entry, geometry, circuit)
+        if cached:
+            entry.hits += 1
+        return entry, cached
+
+    async def _flush(self, entry):
+        """Решение накопленных запросов пакетами"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await asyncio.sleep(self.batch_window)
+                batch, entry.pending = entry.pending, []
+                if not batch:
+                    break
+                try:
+                    currents = await loop.run_in_executor(
+                        self.executor, self._solve, entry, [field for field, _ in batch]
+                    )
+                except Exception as error:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                for k, (_, future) in enumerate(batch):
+                    if not future.done():
+                        future.set_result((currents[:, k], len(batch)))
+        finally:
+            entry.flushing = False
+            entry.task = None
+
+    async def solve(self, material_params, field, mutual_inductances=None):
+        """
+        Решение для структуры material_params при однородном поле field.
+
+        Returns:
+            tuple: (токи (N,), разложение было в кэше, размер пакета)
+        """
+        entry, cached = await self._get_entry(material_params, mutual_inductances)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry.pending.append((field, future))
+        if not entry.flushing:
+            # Флаг ставится до создания задачи: следующий запрос в том же
+            # шаге цикла событий не запустит второй _flush
+            entry.flushing = True
+            entry.task = loop.create_task(self._flush(entry))
+        currents, batch = await future
+        return currents, cached, batch
+
+    async def _handle(self, reader, writer):
+        """Обработка соединения: запросы JSON построчно"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                try:
+                    request = json.loads(line)
+                    currents, cached, batch = await self.solve(
+                        request.get("material", {}),
+                        request.get("field", [0.0, 0.0, 1.0]),
+                        request.get("mutual_inductances"),
+                    )
+                    response = {
+                        "status": "ok",
+                        "currents_real": currents.real.tolist(),
+                        "currents_imag": currents.imag.tolist(),
+                        "cached": cached,
+                        "batch": batch,
+                    }
+                except Exception as error:
+                    response = {"status": "error", "error": f"{type(error).__name__}: {error}"}
+                response["time"] = time.perf_counter() - start
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, path=None, host="127.0.0.1", port=8765):
+        """Запуск сервера на Unix-сокете path или на host:port"""
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            server = await asyncio.start_server(self._handle, host=host, port=port)
+        async with server:
+            await server.serve_forever()
+
+    def __repr__(self):
+        return (f"SolverService(geometries={len(self.geometries)}, entries={len(self.entries)}, "
+                f"max_entries={self.max_entries})")
+
+
+def request(message, path=None, host="127.0.0.1", port=8765):
+    """Синхронный запрос к сервису (одна строка JSON туда и обратно)"""
+    import socket
+
+    if path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(path)
+    else:
+        sock = socket.create_connection((host, port))
+    with sock, sock.makefile("rw") as stream:
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+        return json.loads(stream.readline())
@@ -1,12 +1,103 @@
 import numpy as np
 
+def packed_size(num_rings):
+    """Длина упакованного верхнего треугольника матрицы N x N"""
+    return num_rings * (num_rings + 1) // 2
+
+def packed_indices(num_rings):
+    """
+    Индексы (i, j), i <= j, в порядке упакованного хранения LAPACK 'U':
+    столбец за столбцом, элемент (i, j) имеет номер i + j (j + 1) / 2.
+    """
+    j, i = np.tril_indices(num_rings)
+    return i, j
+
+def pack_symmetric(A):
+    """Упаковка симметричной матрицы (N, N) в вектор верхнего треугольника"""
+    A = np.asarray(A)
+    i, j = packed_indices(len(A))
+    return A[i, j]
+
+def unpack_symmetric(AP, upper_only=False):
+    """
+    Распаковка вектора верхнего треугольника в матрицу (N, N).
+    При upper_only=True нижний треугольник остается нулевым.
+    """
+    AP = np.asarray(AP)
+    N = int(round((np.sqrt(8 * len(AP) + 1) - 1) / 2))
+    if packed_size(N) != len(AP):
+        raise ValueError("Длина вектора не соответствует упакованной матрице")
+    A = np.zeros((N, N), dtype=AP.dtype)
+    i, j = packed_indices(N)
+    A[i, j] = AP
+    if not upper_only:
+        A[j, i] = AP
+    return A
+
+def packed_rows(AP, num_rings, start, stop):
+    """Строки start..stop-1 симметричной матрицы из упакованного верхнего треугольника"""
+    i = np.arange(start, stop)[:, None]
+    j = np.arange(num_rings)[None, :]
+    low, high = np.minimum(i, j), np.maximum(i, j)
+    return AP[low + high * (high + 1) // 2]
+
+def row_block_size(num_rings, itemsize=16):
+    """Число строк в блоке ~4 МБ при размере элемента itemsize"""
+    return max(1, (1 << 22) // (itemsize * max(num_rings, 1)))
+
 class ImpedanceMatrixBuilder:
-    def __init__(self, num_rings, R, L, C, omega):
+    def __init__(self, num_rings, R, L, C, omega, dtype=complex):
         self.N = num_rings
         self.R = R
         self.L = L
         self.C = C
         self.omega = omega
+        self.dtype = dtype # complex128 или complex64
+
+    def build_impedance_matrix(self, mutual_inductances, packed=False):
+        """
+        Параметры:
+        mutual_inductances : ndarray (N, N) или упакованный верхний треугольник
+            (N (N + 1) / 2,) взаимных индуктивностей
+        packed : вернуть Z в упакованном виде (Z = Z^T)
+
+        Returns:
+        ndarray (N, N) или (N (N + 1) / 2,) матрица импедансов Z типа self.dtype
+        """
+        mutual_inductances = np.asarray(mutual_inductances)
+        Z0 = self.R + 1j * self.omega * self.L + 1 / (1j * self.omega * self.C)
+        # Z заполняется по блокам сразу в self.dtype: полная промежуточная
+        # матрица complex128 не создается
+        scale = 1j * self.omega
+
+        if packed:
+            Z = np.empty(packed_size(self.N), dtype=self.dtype)
+            if mutual_inductances.ndim == 2:
+                # Столбец j верхнего треугольника - начало строки j (M = M^T)
+                for j in range(self.N):
+                    start = j * (j + 1) // 2
+                    np.multiply(scale, mutual_inductances[j, :j + 1], out=Z[start:start + j + 1])
+            else:
+                block = row_block_size(self.N) * self.N
+                for k in range(0, len(Z), block):
+                    np.multiply(scale, mutual_inductances[k:k + block], out=Z[k:k + block])
+            diagonal = np.arange(self.N)
+            Z[diagonal * (diagonal + 3) // 2] = Z0
+            return Z
+
+        Z = np.empty((self.N, self.N), dtype=self.dtype)
+        # Для упакованной M блок меньше: индексы строк занимают 8 байт на элемент
+        block = row_block_size(self.N, itemsize=16 if mutual_inductances.ndim == 2 else 64)
+        for k in range(0, self.N, block):
+            stop = min(k + block, self.N)
+            if mutual_inductances.ndim == 1:
+                rows = packed_rows(mutual_inductances, self.N, k, stop)
+            else:
+                rows = mutual_inductances[k:stop]
+            np.multiply(scale, rows, out=Z[k:stop])
+        np.fill_diagonal(Z, Z0)
+
+        return Z
 
 class MutualInductanceCalculator:
     def __init__(self, ring_radius, strip_width):
@@ -31,6 +122,9 @@ class ExternalFluxCalculator:
     def __init__(self, positions, orientations):
         self.positions = positions
         self.orientations = orientations
+        # Единичные нормали считаются один раз (ориентации колец могут быть не нормированы)
+        orientations = np.asarray(orientations, dtype=float)
+        self.normals = orientations / np.linalg.norm(orientations, axis=1)[:, None]
 
     def compute_external_flux(self, B_field):
         """
@@ -41,34 +135,245 @@ class ExternalFluxCalculator:
         ndarray (N,) - вектор внешних потоков Phi_ext
         """
         # Проекция магнитного поля на нормали колец
-        flux = np.array([np.dot(B, n) for B, n in zip(B_field, self.orientations)])
+        flux = np.einsum("ij,ij->i", np.asarray(B_field, dtype=float), self.normals)
         r0 = 1
         area = np.pi * r0 ** 2
         return flux * area
 
-    def build_impedance_matrix(self, mutual_inductances):
+class Solver:
+    def __init__(self, method='direct', precision='double', tol=None, max_refinements=10,
+                 workers=None):
+        self.method = method # 'direct', 'symmetric' или 'ldlt'
+        self.precision = precision # 'double' или 'mixed'
+        self.tol = tol # допустимая обратная ошибка, по умолчанию ~eps * sqrt(N)
+        self.max_refinements = max_refinements
+        self.workers = workers # число потоков для блоков метода 'symmetric'
+        self.info = None # сведения о последнем решении
+
+    def solve(self, Z, V, symmetry=None):
         """
-        Параметры:
-        mutual_inductances : ndarray (N, N) взаимные индуктивности
+        Решение системы Z I = V.
+
+        Parameters:
+        Z : ndarray (N, N) матрица импедансов
+        V : ndarray (N,) или (N, K) правая часть
+        symmetry : CubicSymmetry для метода 'symmetric'
 
         Returns:
-        ndarray (N, N) матрица импедансов Z
+        ndarray токи I
         """
-        Z = np.zeros((self.N, self.N), dtype=complex)
-        Z0 = self.R + 1j * self.omega * self.L + 1 / (1j * self.omega * self.C)
-        np.fill_diagonal(Z, Z0)
+        if self.method == 'direct':
+            if self.precision == 'double':
+                I = np.linalg.solve(Z, V)
+                self.info = {"precision": "double", "refinements": 0, "fallback": False,
+                             "backward_error": max(self._backward_error(Z, V, I),
+                                                   self._storage_error(Z))}
+                return I
+            if self.precision == 'mixed':
+                return self._solve_mixed(Z, V)
+            raise ValueError(f"Неизвестная точность: {self.precision}")
 
-        for i in range(self.N):
-            for j in range(self.N):
-                if i != j:
-                    Z[i, j] = 1j * self.omega * mutual_inductances[i, j]
+        if self.method == 'ldlt':
+            if self.precision == 'double':
+                I = SymmetricFactorization(Z).solve(V)
+                self.info = {"precision": "double", "refinements": 0, "fallback": False,
+                             "backward_error": max(self._backward_error(Z, V, I),
+                                                   self._storage_error(Z))}
+                return I
+            if self.precision == 'mixed':
+                factorization = SymmetricFactorization(Z, dtype=np.complex64)
+                return self._refine(Z, V, factorization.solve,
+                                    lambda V: SymmetricFactorization(Z, dtype=np.complex128).solve(V))
+            raise ValueError(f"Неизвестная точность: {self.precision}")
 
-        return Z
+        if self.method == 'symmetric':
+            if symmetry is None:
+                raise ValueError("Для метода 'symmetric' нужна симметрия (CubicSymmetry)")
+            inner = Solver('direct', self.precision, self.tol, self.max_refinements)
+            I, infos = symmetry.solve(Z, V, solver=inner, workers=self.workers, return_info=True)
+            # Сведения всех блоков, обратная ошибка - по полной системе
+            self.info = {"precision": self.precision,
+                         "refinements": sum(info["refinements"] for info in infos),
+                         "fallback": any(info["fallback"] for info in infos),
+                         "backward_error": max(self._backward_error(Z, V, I),
+                                               self._storage_error(Z))}
+            return I
 
-class Solver:
-    def __init__(self, method='direct'):
-        self.method = method #
-        
-    def solve(self, Z, V):
-        pass
+        raise ValueError(f"Неизвестный метод решения: {self.method}")
+
+    @staticmethod
+    def _block_rows(N):
+        """Число строк в блоке невязки (~4 МБ complex128)"""
+        return row_block_size(N)
+
+    @classmethod
+    def _residual(cls, Z, V, I):
+        """
+        Невязка V - Z I в complex128 и норма ||Z||_inf, считаются по блокам
+        строк, чтобы не переводить всю матрицу Z в complex128.
+        Z может быть упакованным верхним треугольником.
+        """
+        Z = np.asarray(Z)
+        I = np.asarray(I, dtype=np.complex128)
+        r = np.array(V, dtype=np.complex128)
+        N = len(r)
+        norm_Z = 0.0
+        block = cls._block_rows(N)
+        for k in range(0, N, block):
+            if Z.ndim == 1:
+                Z_block = np.asarray(packed_rows(Z, N, k, min(k + block, N)), dtype=np.complex128)
+            else:
+                Z_block = np.asarray(Z[k:k + block], dtype=np.complex128)
+            r[k:k + block] -= Z_block @ I
+            norm_Z = max(norm_Z, float(np.max(np.sum(np.abs(Z_block), axis=1))))
+        return r, norm_Z
+
+    @classmethod
+    def _backward_error(cls, Z, V, I):
+        """Нормированная обратная ошибка ||V - Z I|| / (||Z|| ||I|| + ||V||)"""
+        r, norm_Z = cls._residual(Z, V, I)
+        denom = norm_Z * np.max(np.abs(I)) + np.max(np.abs(V))
+        return float(np.max(np.abs(r)) / denom) if denom > 0 else 0.0
+
+    @staticmethod
+    def _storage_error(Z):
+        """Ошибка округления хранимой матрицы относительно точной системы"""
+        if np.asarray(Z).dtype == np.complex64:
+            return float(np.finfo(np.float32).eps / 2)
+        return 0.0
+
+    def _solve_mixed(self, Z, V):
+        """
+        LU-разложение в complex64 и итерационное уточнение с невязкой
+        в complex128. Если уточнение не сходится, решение повторяется
+        с разложением в complex128.
+
+        Матрица целиком в complex128 не переводится: раскладывается
+        единственная копия Z в complex64, невязка считается по блокам.
+        Обратная ошибка для Z в complex64 не меньше ошибки ее хранения.
+        """
+        from scipy.linalg import lu_factor, lu_solve
+
+        Z = np.asarray(Z)
+
+        # Раскладывается Z^T: для C-упорядоченной Z это F-упорядоченный вид
+        # без копирования в LAPACK, решение - с trans=1
+        if Z.dtype == np.complex64:
+            lu = lu_factor(Z.T, overwrite_a=False, check_finite=False)
+        else:
+            lu = lu_factor(Z.astype(np.complex64).T, overwrite_a=True, check_finite=False)
+
+        def solve_single(b):
+            return lu_solve(lu, b, trans=1, check_finite=False)
+
+        def solve_double(b):
+            # Запасной путь: разложение в complex128
+            return np.linalg.solve(np.asarray(Z, dtype=np.complex128), b)
+
+        return self._refine(Z, V, solve_single, solve_double)
+
+    def _refine(self, Z, V, solve_single, solve_double):
+        """
+        Итерационное уточнение решения, полученного разложением в complex64
+        (solve_single), по невязке в complex128. При остановке сходимости
+        решение повторяется через solve_double.
+        """
+        V = np.asarray(V, dtype=np.complex128)
+        tol = self.tol or np.finfo(np.float64).eps * np.sqrt(len(V))
+
+        I = np.asarray(solve_single(V.astype(np.complex64)), dtype=np.complex128)
+
+        error = self._backward_error(Z, V, I)
+        previous = np.inf
+        refinements = 0
+        while error > tol and refinements < self.max_refinements and error < 0.5 * previous:
+            r, _ = self._residual(Z, V, I)
+            # Масштабирование невязки, чтобы не выйти за диапазон complex64
+            scale = np.max(np.abs(r))
+            dI = solve_single((r / scale).astype(np.complex64))
+            I += scale * np.asarray(dI, dtype=np.complex128)
+            previous, error = error, self._backward_error(Z, V, I)
+            refinements += 1
+
+        fallback = bool(error > tol)
+        if fallback:
+            I = solve_double(V)
+            error = self._backward_error(Z, V, I)
+
+        self.info = {"precision": "mixed", "refinements": refinements, "fallback": fallback,
+                     "backward_error": max(error, self._storage_error(Z))}
+        return I
+
+
+class SymmetricFactorization:
+    """
+    Разложение Бунча-Кауфмана Z = U D U^T комплексно-симметричной матрицы
+    (LAPACK ?sytrf). Используется только верхний треугольник Z.
+    """
+
+    def __init__(self, Z, dtype=None):
+        """
+        Args:
+            Z: матрица (N, N) или упакованный верхний треугольник (N (N + 1) / 2,)
+            dtype: тип разложения (complex64 или complex128);
+                по умолчанию тип Z, вещественная Z - complex128
+        """
+        from scipy.linalg import get_lapack_funcs
+
+        Z = np.asarray(Z)
+        if dtype is None:
+            dtype = Z.dtype if np.iscomplexobj(Z) else np.complex128
+        # Исходную матрицу не портим, рабочую копию можно перезаписать
+        overwrite = Z.ndim == 1 or Z.dtype != dtype
+        if Z.ndim == 1:
+            Z = unpack_symmetric(Z.astype(dtype, copy=False), upper_only=True)
+        Z = Z.astype(dtype, copy=False)
+        self.N = len(Z)
+
+        sytrf, sytrs, sytrf_lwork = get_lapack_funcs(('sytrf', 'sytrs', 'sytrf_lwork'), (Z,))
+        work, _ = sytrf_lwork(self.N, lower=0)
+        lwork = max(int(np.real(work)), 1)
+        self.ldu, self.ipiv, info = sytrf(Z, lower=0, lwork=lwork,
+                                         overwrite_a=overwrite)
+        if info > 0:
+            raise np.linalg.LinAlgError(f"Вырожденная матрица: D[{info - 1}, {info - 1}] = 0")
+        if info < 0:
+            raise ValueError(f"Некорректный аргумент ?sytrf: {-info}")
+        self._sytrs = sytrs
+
+    def solve(self, V):
+        """Решение Z I = V по готовому разложению"""
+        V = np.asarray(V)
+        vector = V.ndim == 1
+        B = V.reshape(self.N, -1).astype(self.ldu.dtype)
+        I, info = self._sytrs(self.ldu, self.ipiv, B, lower=0)
+        if info != 0:
+            raise ValueError(f"Некорректный аргумент ?sytrs: {-info}")
+        return I[:, 0] if vector else I
+
+    def slogdet(self):
+        """
+        Логарифм определителя по блокам D: (sign, logabs), det = sign * exp(logabs).
+        det(U) = 1, перестановки входят в U парами и на знак не влияют.
+        """
+        sign = 1.0 + 0j
+        logabs = 0.0
+        k = 0
+        while k < self.N:
+            if self.ipiv[k] > 0:
+                d = self.ldu[k, k]
+                k += 1
+            else:
+                # Блок 2 x 2 в строках k, k + 1 (верхнее хранение)
+                d = self.ldu[k, k] * self.ldu[k + 1, k + 1] - self.ldu[k, k + 1] ** 2
+                k += 2
+            if d == 0:
+                return 0.0 + 0j, -np.inf
+            sign *= d / abs(d)
+            logabs += np.log(abs(d))
+        return sign, logabs
 
+    def determinant(self):
+        """Определитель Z"""
+        sign, logabs = self.slogdet()
+        return sign * np.exp(logabs)
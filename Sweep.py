@@ -0,0 +1,273 @@
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+from Metamaterial import Metamaterial
+
+# Параметры, изменение которых не меняет геометрию и матрицу M
+CIRCUIT_PARAMETERS = ("resistance", "inductance", "capacitance", "frequency")
+
+
+def parameter_grid(grid):
+    """
+    Декартово произведение значений параметров.
+
+    Args:
+        grid: словарь {параметр: список значений}
+
+    Returns:
+        list: список словарей параметров
+    """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _geometry_key(params):
+    """Ключ группы: все параметры, кроме параметров цепи"""
+    return tuple(sorted(
+        (key, repr(value)) for key, value in params.items() if key not in CIRCUIT_PARAMETERS
+    ))
+
+
+def _config_key(params):
+    """Хэш параметров конфигурации (для сопоставления при возобновлении)"""
+    # Скаляры numpy приводятся к типам Python, чтобы ключ не зависел от типа
+    text = json.dumps(params, sort_keys=True,
+                      default=lambda value: value.item() if hasattr(value, "item") else repr(value))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _encode(value):
+    """Значения, которые json не сериализует сам: комплексные числа и типы numpy"""
+    if isinstance(value, complex):
+        return {"re": value.real, "im": value.imag}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def _decode(record):
+    """Обратное преобразование комплексных чисел из {"re", "im"}"""
+    if record.keys() == {"re", "im"}:
+        return complex(record["re"], record["im"])
+    return record
+
+
+def _error_row(params, error):
+    """Строка результата для конфигурации с ошибкой"""
+    row = dict(params)
+    row["error"] = f"{type(error).__name__}: {error}"
+    return row
+
+
+def _run_group(structure, evaluate, group):
+    """
+    Расчет группы конфигураций с общей геометрией в одном процессе.
+    Материал строится один раз, для остальных конфигураций меняются
+    только параметры цепи. cache живет в пределах группы (например, для M).
+    Ошибка конфигурации попадает в столбец "error" и не прерывает группу.
+    """
+    results = []
+    material = None
+    cache = {}
+    defaults = structure.get_default_parameters()
+    for index, params in group:
+        try:
+            if material is None:
+                material = Metamaterial(structure, **params)
+            else:
+                # Все параметры цепи: отсутствующие в params - по умолчанию,
+                # а не от предыдущей конфигурации группы
+                circuit = {key: params.get(key, defaults[key]) for key in CIRCUIT_PARAMETERS}
+                material.update_circuit_parameters(**circuit)
+            row = dict(params)
+            row.update(evaluate(material, params, cache))
+        except Exception as error:
+            row = _error_row(params, error)
+        results.append((index, row))
+    return results
+
+
+class ResultTable:
+    """
+    Таблица результатов по столбцам.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.indices = []
+
+    def append(self, index, row):
+        """Добавить строку (отсутствующие значения - None)"""
+        n = len(self.indices)
+        for key in row:
+            if key not in self.columns:
+                self.columns[key] = [None] * n
+        for key, column in self.columns.items():
+            column.append(row.get(key))
+        self.indices.append(index)
+
+    def sort(self):
+        """Упорядочить строки по номеру конфигурации"""
+        order = np.argsort(self.indices, kind="stable")
+        self.indices = [self.indices[i] for i in order]
+        for key, column in self.columns.items():
+            self.columns[key] = [column[i] for i in order]
+
+    def __getitem__(self, key):
+        return np.array(self.columns[key])
+
+    def __len__(self):
+        return len(self.indices)
+
+    def save(self, filename):
+        """Сохранение в .npz"""
+        data = {key: np.array(column) for key, column in self.columns.items()}
+        np.savez(filename, index=np.array(self.indices), **data)
+
+    @staticmethod
+    def read_checkpoint(filename):
+        """
+        Чтение файла контрольной точки (JSON Lines).
+        Недописанная последняя строка (прерванная запись) отрезается,
+        чтобы следующие записи начинались с новой строки.
+
+        Returns:
+            dict: {хэш параметров: строка результата}
+        """
+        records = {}
+        if not os.path.exists(filename):
+            return records
+
+        with open(filename, "rb+") as f:
+            data = f.read()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                f.truncate(complete)
+
+        for line in data[:complete].decode().splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line, object_hook=_decode)
+                records[record["key"]] = record["row"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+        return records
+
+    def __repr__(self):
+        return f"ResultTable(rows={len(self)}, columns={list(self.columns)})"
+
+
+class ParameterSweep:
+    """
+    Перебор конфигураций CubicStructure в пуле процессов.
+
+    Конфигурации с одинаковой геометрией (отличаются только параметрами
+    цепи) объединяются в группы и считаются в одном процессе с общим
+    материалом. Готовые строки сразу дописываются в файл контрольной
+    точки вместе с хэшем параметров; при повторном запуске пропускаются
+    конфигурации с совпадающими параметрами, независимо от их порядка.
+    Строки с ошибкой в контрольную точку не пишутся и пересчитываются.
+    """
+
+    def __init__(self, structure, evaluate, configurations, checkpoint=None,
+                 workers=None, max_group_size=64):
+        """
+        Args:
+            structure: тип структуры (например, CubicStructure())
+            evaluate: функция (material, params, cache) -> dict скалярных
+                результатов; для пула процессов - функция уровня модуля
+            configurations: итерируемый набор словарей параметров
+                (parameter_grid или любой генератор выборки)
+            checkpoint: файл контрольной точки (JSON Lines)
+            workers: число процессов; None - по числу ядер, 1 - без пула
+            max_group_size: максимальный размер группы (для балансировки)
+        """
+        self.structure = structure
+        self.evaluate = evaluate
+        self.configurations = list(configurations)
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.max_group_size = max_group_size
+
+    def _groups(self, indices):
+        """Разбиение конфигураций с номерами indices на группы по геометрии"""
+        groups = {}
+        for index in indices:
+            params = self.configurations[index]
+            groups.setdefault(_geometry_key(params), []).append((index, params))
+
+        tasks = []
+        for group in groups.values():
+            for start in range(0, len(group), self.max_group_size):
+                tasks.append(group[start:start + self.max_group_size])
+        return tasks
+
+    def run(self):
+        """
+        Запуск перебора.
+
+        Returns:
+            ResultTable: результаты всех конфигураций, упорядоченные по номеру
+        """
+        table = ResultTable()
+        done = ResultTable.read_checkpoint(self.checkpoint) if self.checkpoint is not None else {}
+        keys = [_config_key(params) for params in self.configurations]
+
+        remaining = []
+        for index, key in enumerate(keys):
+            if key in done:
+                table.append(index, done[key])
+            else:
+                remaining.append(index)
+
+        log = open(self.checkpoint, "a") if self.checkpoint is not None else None
+
+        def record(results):
+            for index, row in results:
+                if log is not None and "error" not in row:
+                    try:
+                        line = json.dumps({"index": index, "key": keys[index], "row": row},
+                                          default=_encode)
+                    except (TypeError, ValueError) as error:
+                        row = _error_row(self.configurations[index], error)
+                    else:
+                        log.write(line + "\n")
+                table.append(index, row)
+            if log is not None:
+                log.flush()
+
+        try:
+            tasks = self._groups(remaining)
+            if self.workers == 1:
+                for group in tasks:
+                    record(_run_group(self.structure, self.evaluate, group))
+            else:
+                from concurrent.futures import ProcessPoolExecutor, as_completed
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    futures = {
+                        pool.submit(_run_group, self.structure, self.evaluate, group): group
+                        for group in tasks
+                    }
+                    for future in as_completed(futures):
+                        try:
+                            results = future.result()
+                        except Exception as error:
+                            # Ошибка всей группы (например, падение процесса)
+                            results = [(index, _error_row(params, error))
+                                       for index, params in futures[future]]
+                        record(results)
+        finally:
+            if log is not None:
+                log.close()
+
+        table.sort()
+        return table
+
+    def __repr__(self):
+        return f"ParameterSweep(configurations={len(self.configurations)}, workers={self.workers})"
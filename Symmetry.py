@@ -0,0 +1,299 @@
+import copy
+import itertools
+import numpy as np
+from Solver import Solver
+
+
+def cubic_point_group():
+    """
+    48 операций кубической точечной группы Oh
+    (все матрицы перестановок осей со знаками).
+    """
+    operations = []
+    for perm in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            R = np.zeros((3, 3))
+            for row, (col, sign) in enumerate(zip(perm, signs)):
+                R[row, col] = sign
+            operations.append(R)
+    return operations
+
+
+class CubicSymmetry:
+    """
+    Симметрия таблицы колец относительно кубической точечной группы.
+
+    Операция группы переводит кольцо i в кольцо perm[i], нормаль при этом
+    может поменять знак (signs[i] = -1), что меняет знак тока.
+    Матрица Z, инвариантная относительно этих операций, блочно
+    диагонализуется по изотипическим компонентам неприводимых представлений.
+    """
+
+    def __init__(self, positions, orientations, ring_params=None, center=None, tol=1e-9):
+        """
+        Args:
+            positions: позиции колец (N, 3)
+            orientations: нормали колец (N, 3)
+            ring_params: параметры колец (кортежи), которые должны совпадать
+                у переставляемых колец; None - не проверять
+            center: центр симметрии; по умолчанию центр масс колец
+            tol: относительный допуск сравнения координат
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        orientations = np.asarray(orientations, dtype=float).reshape(-1, 3)
+        self.orientations = orientations / np.linalg.norm(orientations, axis=1)[:, None]
+        self.N = len(self.positions)
+        self.ring_params = ring_params
+        self.center = self.positions.mean(axis=0) if center is None and self.N > 0 else center
+        self.tol = tol
+
+        # Операции, сохраняющие таблицу колец: (R, perm, signs)
+        self.operations = self._detect_operations()
+        self.order = len(self.operations)
+
+        # Базис блоков: список (rows, cols, vals, size)
+        self.blocks = self._build_blocks() if self.N > 0 else []
+
+    @classmethod
+    def from_ring_system(cls, ring_system, center=None, tol=1e-9):
+        """Симметрия системы колец"""
+        ring_params = [
+            (ring.R, ring.L, ring.C, ring.omega, ring.radius, ring.strip_width)
+            for ring in ring_system.rings
+        ]
+        return cls(ring_system.get_positions(), ring_system.get_orientations(),
+                   ring_params=ring_params, center=center, tol=tol)
+
+    def _keys(self, positions, orientations):
+        """Ключи колец: квантованные позиция, нормаль с точностью до знака, параметры"""
+        scale = np.max(np.abs(self.positions - self.center)) if self.N > 0 else 1.0
+        step = max(scale, 1.0e-300) * self.tol * 1e3
+        pos_q = np.round((positions - self.center) / step).astype(np.int64)
+
+        # Нормаль приводится к виду с положительной первой ненулевой компонентой
+        first = np.argmax(np.abs(orientations) > 1e-6, axis=1)
+        signs = np.sign(orientations[np.arange(len(orientations)), first])
+        signs[signs == 0] = 1
+        orient_q = np.round(orientations * signs[:, None] * 1e6).astype(np.int64)
+
+        keys = []
+        for i in range(len(positions)):
+            params = self.ring_params[i] if self.ring_params is not None else None
+            keys.append((tuple(pos_q[i]), tuple(orient_q[i]), params))
+        return keys, signs
+
+    def _detect_operations(self):
+        """Поиск операций Oh, переводящих таблицу колец в себя"""
+        if self.N == 0:
+            return []
+
+        keys, signs = self._keys(self.positions, self.orientations)
+        index = {}
+        for i, key in enumerate(keys):
+            if key in index:
+                # Совпадающие кольца не различимы - симметрию не ищем
+                return [(np.eye(3), np.arange(self.N), np.ones(self.N))]
+            index[key] = i
+
+        operations = []
+        for R in cubic_point_group():
+            new_positions = (self.positions - self.center) @ R.T + self.center
+            new_orientations = self.orientations @ R.T
+            new_keys, new_signs = self._keys(new_positions, new_orientations)
+
+            perm = np.empty(self.N, dtype=np.int64)
+            valid = True
+            for i, key in enumerate(new_keys):
+                j = index.get(key)
+                if j is None:
+                    valid = False
+                    break
+                perm[i] = j
+            if not valid:
+                continue
+
+            # R n_i = s_i n_perm[i]
+            op_signs = new_signs * signs[perm]
+            operations.append((R, perm, op_signs))
+
+        return operations
+
+    def _conjugacy_classes(self):
+        """Классы сопряженности найденной подгруппы"""
+        matrices = [R for R, _, _ in self.operations]
+        lookup = {tuple(np.round(R).astype(int).ravel()): k for k, R in enumerate(matrices)}
+
+        classes = []
+        assigned = set()
+        for k, g in enumerate(matrices):
+            if k in assigned:
+                continue
+            members = set()
+            for h in matrices:
+                conj = h @ g @ h.T
+                members.add(lookup[tuple(np.round(conj).astype(int).ravel())])
+            assigned.update(members)
+            classes.append(sorted(members))
+        return classes
+
+    def _build_blocks(self):
+        """
+        Разбиение пространства токов на изотипические компоненты.
+
+        Симметризованная сумма классов H = sum a_k (C_k + C_k^T) лежит в центре
+        групповой алгебры и на каждой изотипической компоненте действует
+        скаляром. Операции не смешивают орбиты колец, поэтому H
+        диагонализуется по орбитам (размер орбиты <= 48), а собственные
+        векторы группируются по собственным значениям.
+        """
+        rng = np.random.default_rng(0)
+        classes = self._conjugacy_classes()
+        weights = rng.uniform(1.0, 2.0, size=len(classes))
+
+        # Орбиты колец
+        orbit_of = -np.ones(self.N, dtype=np.int64)
+        orbits = []
+        for i in range(self.N):
+            if orbit_of[i] >= 0:
+                continue
+            members = sorted({int(perm[i]) for _, perm, _ in self.operations})
+            orbit_of[members] = len(orbits)
+            orbits.append(np.array(members))
+
+        rows, values, vectors = [], [], []
+        for members in orbits:
+            local = {int(m): k for k, m in enumerate(members)}
+            n = len(members)
+            H = np.zeros((n, n))
+            for weight, cls in zip(weights, classes):
+                C = np.zeros((n, n))
+                for k in cls:
+                    _, perm, signs = self.operations[k]
+                    for m in members:
+                        C[local[int(perm[m])], local[int(m)]] += signs[m]
+                H += weight * (C + C.T)
+            eigvals, eigvecs = np.linalg.eigh(H)
+            for k in range(n):
+                rows.append(members)
+                values.append(eigvals[k])
+                vectors.append(eigvecs[:, k])
+
+        # Группировка собственных векторов по собственным значениям
+        values = np.array(values)
+        order = np.argsort(values)
+        scale = max(np.max(np.abs(values)), 1.0)
+        split = np.where(np.diff(values[order]) > 1e-6 * scale)[0] + 1
+
+        blocks = []
+        for group in np.split(order, split):
+            block_rows, block_cols, block_vals = [], [], []
+            for col, k in enumerate(group):
+                vec = vectors[k]
+                mask = np.abs(vec) > 1e-12
+                block_rows.append(rows[k][mask])
+                block_cols.append(np.full(np.count_nonzero(mask), col))
+                block_vals.append(vec[mask])
+            blocks.append((
+                np.concatenate(block_rows),
+                np.concatenate(block_cols),
+                np.concatenate(block_vals),
+                len(group)
+            ))
+        return blocks
+
+    def get_block_sizes(self):
+        """Размеры блоков"""
+        return [size for _, _, _, size in self.blocks]
+
+    def _basis(self, block):
+        """Разреженная матрица базиса блока (N, n_k)"""
+        from scipy.sparse import csc_matrix
+        rows, cols, vals, size = block
+        return csc_matrix((vals, (rows, cols)), shape=(self.N, size))
+
+    def is_invariant(self, Z, rtol=1e-8):
+        """Проверка инвариантности матрицы относительно найденных операций"""
+        Z = np.asarray(Z)
+        scale = np.max(np.abs(Z)) if Z.size else 1.0
+        for _, perm, signs in self.operations:
+            # (P Z P^T)[perm[i], perm[j]] = s_i s_j Z[i, j]
+            Zg = np.empty_like(Z)
+            Zg[np.ix_(perm, perm)] = Z * np.outer(signs, signs)
+            if np.max(np.abs(Zg - Z)) > rtol * scale:
+                return False
+        return True
+
+    def block_diagonalize(self, Z):
+        """
+        Блоки U_k^T Z U_k матрицы Z.
+
+        Returns:
+            list: список матриц блоков
+        """
+        result = []
+        for block in self.blocks:
+            U = self._basis(block)
+            ZU = (U.T @ np.asarray(Z).T).T
+            result.append(np.asarray((U.T @ ZU)))
+        return result
+
+    def solve(self, Z, V, solver=None, workers=None, return_info=False):
+        """
+        Решение Z I = V по блокам неприводимых представлений.
+
+        Блоки с нулевой правой частью пропускаются, поэтому для
+        симметричного возбуждения решается только блок единичного
+        представления.
+
+        Args:
+            Z: матрица импедансов (N, N), инвариантная относительно группы
+            V: правая часть (N,) или (N, K)
+            solver: объект Solver для блоков; по умолчанию прямой
+            workers: число потоков для независимых блоков
+            return_info: вернуть также сведения Solver.info каждого блока
+
+        Returns:
+            ndarray: токи той же формы, что V
+            (и список сведений по блокам при return_info=True)
+        """
+        solver = solver or Solver()
+        Z = np.asarray(Z)
+        V = np.asarray(V)
+        vector = V.ndim == 1
+        V2 = V.reshape(self.N, -1)
+        scale = np.max(np.abs(V2)) if V2.size else 0.0
+
+        tasks = []
+        for block in self.blocks:
+            U = self._basis(block)
+            Vk = np.asarray(U.T @ V2)
+            if np.max(np.abs(Vk)) <= 1e-14 * scale:
+                continue
+            tasks.append((U, Vk))
+
+        def solve_block(task):
+            U, Vk = task
+            ZU = (U.T @ Z.T).T
+            Zk = np.asarray(U.T @ ZU)
+            # Своя копия решателя: info не разделяется между потоками
+            block_solver = copy.copy(solver)
+            return U, block_solver.solve(Zk, Vk), block_solver.info
+
+        if workers and workers > 1 and len(tasks) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(solve_block, tasks))
+        else:
+            results = [solve_block(task) for task in tasks]
+
+        I = np.zeros(V2.shape, dtype=np.result_type(Z, V2, complex))
+        for U, Ik, _ in results:
+            I += U @ np.asarray(Ik).reshape(U.shape[1], -1)
+
+        I = I[:, 0] if vector else I
+        if return_info:
+            return I, [info for _, _, info in results]
+        return I
+
+    def __repr__(self):
+        return f"CubicSymmetry(rings={self.N}, order={self.order}, blocks={len(self.blocks)})"
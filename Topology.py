@@ -0,0 +1,244 @@
+import numpy as np
+
+# Типы мест колец
+SITE_FACE = 0
+SITE_EDGE = 1
+SITE_VERTEX = 2
+
+
+def _csr_regular(table):
+    """CSR для таблицы с одинаковым числом соседей (M, k)"""
+    table = np.asarray(table, dtype=np.int32)
+    indptr = np.arange(0, table.size + 1, table.shape[1], dtype=np.int32)
+    return indptr, table.ravel()
+
+
+def _csr_transpose(indptr, indices, n_cols):
+    """Транспонирование связности в CSR: (строка -> столбцы) в (столбец -> строки)"""
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    counts = np.bincount(indices, minlength=n_cols)
+    new_indptr = np.zeros(n_cols + 1, dtype=np.int32)
+    np.cumsum(counts, out=new_indptr[1:])
+    return new_indptr, rows[order]
+
+
+class CubicTopology:
+    """
+    Топология кубической решетки без дублирования: уникальные ребра и грани
+    (int32), связности ячейка <-> грань <-> ребро <-> вершина в CSR и
+    привязка колец к местам (грань, ребро, вершина).
+
+    Нумерация совпадает с порядком генерации колец в CubicStructure:
+    грани X, Y, Z; ребра X, Y, Z; вершины как в calculate_geometry.
+    """
+
+    def __init__(self, grid_x, grid_y, grid_z, rings_on_faces=True,
+                 rings_on_edges=True, rings_on_corners=True, spacing=1.0):
+        """
+        Args:
+            grid_x, grid_y, grid_z: размеры решетки в ячейках
+            rings_on_faces, rings_on_edges, rings_on_corners: места колец
+            spacing: длина ребра ячейки (для координат вершин)
+        """
+        self.shape = (grid_x, grid_y, grid_z)
+        self.spacing = spacing
+        gx, gy, gz = self.shape
+
+        self.n_vertices = (gx + 1) * (gy + 1) * (gz + 1)
+        self.n_cells = gx * gy * gz
+        self._face_offsets = np.cumsum([0, (gx + 1) * gy * gz, gx * (gy + 1) * gz, gx * gy * (gz + 1)])
+        self._edge_offsets = np.cumsum([0, gx * (gy + 1) * (gz + 1), (gx + 1) * gy * (gz + 1),
+                                        (gx + 1) * (gy + 1) * gz])
+        self.n_faces = int(self._face_offsets[-1])
+        self.n_edges = int(self._edge_offsets[-1])
+
+        self.edges = self._build_edges()
+        self.faces = self._build_faces()
+
+        # Связности вниз по размерности
+        self.cell_faces = _csr_regular(self._build_cell_faces())
+        self.face_edges = _csr_regular(self._build_face_edges())
+        self.edge_vertices = _csr_regular(self.edges)
+
+        # Обратные связности
+        self.face_cells = _csr_transpose(*self.cell_faces, self.n_faces)
+        self.edge_faces = _csr_transpose(*self.face_edges, self.n_edges)
+        self.vertex_edges = _csr_transpose(*self.edge_vertices, self.n_vertices)
+
+        # Кольца: тип места и номер места; для мест - номер кольца или -1
+        kinds, sites = [], []
+        if rings_on_faces:
+            kinds.append(np.full(self.n_faces, SITE_FACE, dtype=np.int8))
+            sites.append(np.arange(self.n_faces, dtype=np.int32))
+        if rings_on_edges:
+            kinds.append(np.full(self.n_edges, SITE_EDGE, dtype=np.int8))
+            sites.append(np.arange(self.n_edges, dtype=np.int32))
+        if rings_on_corners:
+            kinds.append(np.full(self.n_vertices, SITE_VERTEX, dtype=np.int8))
+            sites.append(np.arange(self.n_vertices, dtype=np.int32))
+        self.ring_site_kind = np.concatenate(kinds) if kinds else np.zeros(0, dtype=np.int8)
+        self.ring_site_index = np.concatenate(sites) if sites else np.zeros(0, dtype=np.int32)
+        self._update_site_rings()
+
+    # Нумерация вершин, ребер и граней
+
+    def _grid(self, nx, ny, nz):
+        """Индексы (x, y, z) узлов сетки nx x ny x nz в порядке x, y, z"""
+        x, y, z = np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing="ij")
+        return x.ravel(), y.ravel(), z.ravel()
+
+    def vertex_index(self, x, y, z):
+        """Номер вершины (x, y, z)"""
+        gx, gy, gz = self.shape
+        return x * (gy + 1) * (gz + 1) + y * (gz + 1) + z
+
+    def edge_index(self, axis, x, y, z):
+        """Номер ребра вдоль оси axis, начинающегося в вершине (x, y, z)"""
+        gx, gy, gz = self.shape
+        if axis == 0:
+            local = x * (gy + 1) * (gz + 1) + y * (gz + 1) + z
+        elif axis == 1:
+            local = x * gy * (gz + 1) + y * (gz + 1) + z
+        else:
+            local = x * (gy + 1) * gz + y * gz + z
+        return self._edge_offsets[axis] + local
+
+    def face_index(self, axis, x, y, z):
+        """Номер грани с нормалью вдоль оси axis и младшей вершиной (x, y, z)"""
+        gx, gy, gz = self.shape
+        if axis == 0:
+            local = x * gy * gz + y * gz + z
+        elif axis == 1:
+            local = x * (gy + 1) * gz + y * gz + z
+        else:
+            local = x * gy * (gz + 1) + y * (gz + 1) + z
+        return self._face_offsets[axis] + local
+
+    def cell_index(self, x, y, z):
+        """Номер ячейки (x, y, z)"""
+        gx, gy, gz = self.shape
+        return x * gy * gz + y * gz + z
+
+    def vertex_positions(self):
+        """Координаты вершин (V, 3) в порядке нумерации вершин"""
+        gx, gy, gz = self.shape
+        return np.stack(self._grid(gx + 1, gy + 1, gz + 1), axis=1) * self.spacing
+
+    def _build_edges(self):
+        """Уникальные ребра (E, 2)"""
+        gx, gy, gz = self.shape
+        v = self.vertex_index
+        blocks = []
+        x, y, z = self._grid(gx, gy + 1, gz + 1)
+        blocks.append(np.stack([v(x, y, z), v(x + 1, y, z)], axis=1))
+        x, y, z = self._grid(gx + 1, gy, gz + 1)
+        blocks.append(np.stack([v(x, y, z), v(x, y + 1, z)], axis=1))
+        x, y, z = self._grid(gx + 1, gy + 1, gz)
+        blocks.append(np.stack([v(x, y, z), v(x, y, z + 1)], axis=1))
+        return np.concatenate(blocks).astype(np.int32)
+
+    def _build_faces(self):
+        """Уникальные грани (F, 4), вершины по обходу контура"""
+        gx, gy, gz = self.shape
+        v = self.vertex_index
+        blocks = []
+        x, y, z = self._grid(gx + 1, gy, gz)
+        blocks.append(np.stack([v(x, y, z), v(x, y + 1, z), v(x, y + 1, z + 1), v(x, y, z + 1)], axis=1))
+        x, y, z = self._grid(gx, gy + 1, gz)
+        blocks.append(np.stack([v(x, y, z), v(x + 1, y, z), v(x + 1, y, z + 1), v(x, y, z + 1)], axis=1))
+        x, y, z = self._grid(gx, gy, gz + 1)
+        blocks.append(np.stack([v(x, y, z), v(x + 1, y, z), v(x + 1, y + 1, z), v(x, y + 1, z)], axis=1))
+        return np.concatenate(blocks).astype(np.int32)
+
+    def _build_cell_faces(self):
+        """Грани ячеек (C, 6)"""
+        gx, gy, gz = self.shape
+        f = self.face_index
+        x, y, z = self._grid(gx, gy, gz)
+        return np.stack([
+            f(0, x, y, z), f(0, x + 1, y, z),
+            f(1, x, y, z), f(1, x, y + 1, z),
+            f(2, x, y, z), f(2, x, y, z + 1)
+        ], axis=1)
+
+    def _build_face_edges(self):
+        """Ребра граней (F, 4)"""
+        gx, gy, gz = self.shape
+        e = self.edge_index
+        blocks = []
+        x, y, z = self._grid(gx + 1, gy, gz)
+        blocks.append(np.stack([e(1, x, y, z), e(1, x, y, z + 1), e(2, x, y, z), e(2, x, y + 1, z)], axis=1))
+        x, y, z = self._grid(gx, gy + 1, gz)
+        blocks.append(np.stack([e(0, x, y, z), e(0, x, y, z + 1), e(2, x, y, z), e(2, x + 1, y, z)], axis=1))
+        x, y, z = self._grid(gx, gy, gz + 1)
+        blocks.append(np.stack([e(0, x, y, z), e(0, x, y + 1, z), e(1, x, y, z), e(1, x + 1, y, z)], axis=1))
+        return np.concatenate(blocks)
+
+    # Привязка колец к местам
+
+    def _update_site_rings(self):
+        """Обратное отображение место -> кольцо (-1, если кольца нет)"""
+        self.face_ring = np.full(self.n_faces, -1, dtype=np.int32)
+        self.edge_ring = np.full(self.n_edges, -1, dtype=np.int32)
+        self.vertex_ring = np.full(self.n_vertices, -1, dtype=np.int32)
+        rings = np.arange(len(self.ring_site_kind), dtype=np.int32)
+        for kind, table in ((SITE_FACE, self.face_ring), (SITE_EDGE, self.edge_ring),
+                            (SITE_VERTEX, self.vertex_ring)):
+            mask = self.ring_site_kind == kind
+            table[self.ring_site_index[mask]] = rings[mask]
+
+    def append_ring(self, kind=-1, index=-1):
+        """Учесть добавленное кольцо (по умолчанию без привязки к месту)"""
+        self.ring_site_kind = np.append(self.ring_site_kind, np.int8(kind))
+        self.ring_site_index = np.append(self.ring_site_index, np.int32(index))
+        self._update_site_rings()
+
+    def remove_ring(self, ring):
+        """Учесть удаление кольца"""
+        self.ring_site_kind = np.delete(self.ring_site_kind, ring)
+        self.ring_site_index = np.delete(self.ring_site_index, ring)
+        self._update_site_rings()
+
+    # Запросы соседей
+
+    @staticmethod
+    def neighbors(relation, i):
+        """Соседи i в связности relation = (indptr, indices)"""
+        indptr, indices = relation
+        return indices[indptr[i]:indptr[i + 1]]
+
+    def _rings_at(self, faces=(), edges=(), vertices=()):
+        """Кольца на заданных местах"""
+        rings = np.concatenate([
+            self.face_ring[np.asarray(faces, dtype=np.int64)],
+            self.edge_ring[np.asarray(edges, dtype=np.int64)],
+            self.vertex_ring[np.asarray(vertices, dtype=np.int64)],
+        ])
+        return np.unique(rings[rings >= 0])
+
+    def cell_rings(self, cell):
+        """Кольца на гранях, ребрах и вершинах ячейки"""
+        faces = self.neighbors(self.cell_faces, cell)
+        edges = np.unique(np.concatenate([self.neighbors(self.face_edges, f) for f in faces]))
+        vertices = np.unique(self.edges[edges])
+        return self._rings_at(faces, edges, vertices)
+
+    def vertex_rings(self, vertex):
+        """Кольца в вершине, на ее ребрах и на гранях, содержащих эти ребра"""
+        edges = self.neighbors(self.vertex_edges, vertex)
+        faces = np.unique(np.concatenate([self.neighbors(self.edge_faces, e) for e in edges]))
+        return self._rings_at(faces, edges, [vertex])
+
+    def get_memory_size(self):
+        """Объем массивов топологии (байт)"""
+        arrays = [self.edges, self.faces, self.ring_site_kind, self.ring_site_index,
+                  self.face_ring, self.edge_ring, self.vertex_ring]
+        # edge_vertices разделяет данные с edges
+        for relation in (self.cell_faces, self.face_edges, self.face_cells, self.edge_faces, self.vertex_edges):
+            arrays.extend(relation)
+        return sum(a.nbytes for a in arrays)
+
+    def __repr__(self):
+        return (f"CubicTopology(cells={self.n_cells}, faces={self.n_faces}, "
+                f"edges={self.n_edges}, vertices={self.n_vertices})")
@@ -0,0 +1,218 @@
+import numpy as np
+from Solver import ExternalFluxCalculator
+
+
+class TransientSimulator:
+    """
+    Переходный процесс в системе связанных RLC-колец:
+
+        (L + M) dI/dt + R I + q / C = -dPhi_ext/dt,   dq/dt = I
+
+    Неявное интегрирование с постоянным шагом. Матрица системы
+    постоянна, поэтому раскладывается один раз перед расчетом.
+    """
+
+    def __init__(self, mutual_inductances, R, L, C, positions=None, orientations=None,
+                 method='trapezoidal', tol=1e-10):
+        """
+        Args:
+            mutual_inductances: взаимные индуктивности M (нули на диагонали):
+                ndarray (N, N), разреженная матрица scipy или функция x -> M x
+            R, L, C: параметры колец (скаляры или массивы (N,))
+            positions, orientations: позиции и нормали колец для внешнего поля B(t)
+            method: 'trapezoidal' (2-й порядок) или 'bdf1' (неявный Эйлер)
+            tol: относительная точность итерационного решения для M в виде функции
+        """
+        self.M = mutual_inductances
+        self.matrix_free = callable(mutual_inductances)
+        if self.matrix_free:
+            if positions is None:
+                raise ValueError("Для M в виде функции нужны позиции колец")
+            self.N = len(positions)
+        else:
+            self.N = mutual_inductances.shape[0]
+
+        self.R = np.broadcast_to(np.asarray(R, dtype=float), (self.N,))
+        self.L = np.broadcast_to(np.asarray(L, dtype=float), (self.N,))
+        self.C = np.broadcast_to(np.asarray(C, dtype=float), (self.N,))
+        self.positions = positions
+        self.orientations = orientations
+        # Нормали нормируются один раз, а не на каждом шаге
+        self._flux_calc = ExternalFluxCalculator(positions, orientations) if orientations is not None else None
+
+        if method not in ('trapezoidal', 'bdf1'):
+            raise ValueError(f"Неизвестный метод интегрирования: {method}")
+        self.method = method
+        self.tol = tol
+
+        self._dt = None
+        self._solve = None
+        self.charges = None
+
+    @classmethod
+    def from_ring_system(cls, ring_system, mutual_inductances, **kwargs):
+        """Симулятор для системы колец с заданной матрицей M"""
+        rings = ring_system.rings
+        return cls(
+            mutual_inductances,
+            R=[ring.R for ring in rings],
+            L=[ring.L for ring in rings],
+            C=[ring.C for ring in rings],
+            positions=ring_system.get_positions(),
+            orientations=ring_system.get_orientations(),
+            **kwargs
+        )
+
+    def _apply_M(self, x):
+        """M x"""
+        if self.matrix_free:
+            return np.asarray(self.M(x))
+        return np.asarray(self.M @ x)
+
+    def _apply_L_total(self, x):
+        """(L + M) x"""
+        return self.L * x + self._apply_M(x)
+
+    def _coefficients(self, dt):
+        """Коэффициенты при R и 1/C в матрице шага K = L + M + a R + b / C"""
+        if self.method == 'trapezoidal':
+            return dt / 2, dt ** 2 / 4
+        return dt, dt ** 2
+
+    def _factorize(self, dt):
+        """Разложение матрицы шага K (один раз для данного dt)"""
+        a, b = self._coefficients(dt)
+        diagonal = self.L + a * self.R + b / self.C
+
+        if self.matrix_free:
+            from scipy.sparse.linalg import LinearOperator, cg
+
+            K = LinearOperator((self.N, self.N), dtype=float,
+                               matvec=lambda x: diagonal * x + self._apply_M(x))
+            preconditioner = LinearOperator((self.N, self.N), dtype=float,
+                                            matvec=lambda x: x / diagonal)
+
+            def solve(rhs):
+                x, info = cg(K, rhs, rtol=self.tol, M=preconditioner)
+                if info != 0:
+                    raise RuntimeError(f"Итерационное решение не сошлось (info={info})")
+                return x
+
+        elif hasattr(self.M, "tocsc"):
+            from scipy.sparse import diags
+            from scipy.sparse.linalg import splu
+
+            lu = splu((self.M + diags(diagonal)).tocsc())
+            solve = lu.solve
+
+        else:
+            from scipy.linalg import cho_factor, cho_solve, lu_factor, lu_solve
+
+            K = np.array(self.M, dtype=float)
+            K[np.diag_indices(self.N)] += diagonal
+            try:
+                factor = cho_factor(K, overwrite_a=False)
+                solve = lambda rhs: cho_solve(factor, rhs)
+            except np.linalg.LinAlgError:
+                # L + M не положительно определена (например, при приближенной M)
+                factor = lu_factor(K, overwrite_a=True)
+                solve = lambda rhs: lu_solve(factor, rhs)
+
+        self._dt = dt
+        self._solve = solve
+
+    def _external_flux(self, t, external_flux, external_field):
+        """Внешний поток Phi_ext(t)"""
+        if external_flux is not None:
+            return np.broadcast_to(np.asarray(external_flux(t), dtype=float), (self.N,))
+        if external_field is not None:
+            if self._flux_calc is None:
+                raise ValueError("Для внешнего поля B(t) нужны нормали колец")
+            B = np.broadcast_to(np.asarray(external_field(t), dtype=float), (self.N, 3))
+            return self._flux_calc.compute_external_flux(B)
+        return np.zeros(self.N)
+
+    def run(self, t_end, dt, external_flux=None, external_field=None, t_start=0.0,
+            I0=None, q0=None, output=None, chunk_size=1000):
+        """
+        Расчет переходного процесса.
+
+        Args:
+            t_end: конечное время (с)
+            dt: шаг по времени (с)
+            external_flux: функция t -> Phi_ext (N,)
+            external_field: функция t -> B (3,) или (N, 3); используется,
+                если external_flux не задан
+            t_start: начальное время (с)
+            I0, q0: начальные токи и заряды (по умолчанию нули)
+            output: имя .npy файла для токов; запись идет порциями
+                по chunk_size шагов, в памяти хранится только порция
+            chunk_size: размер порции записи
+
+        Returns:
+            tuple: (times, currents), currents (steps + 1, N) -
+                массив в памяти или np.memmap при заданном output
+        """
+        if dt <= 0:
+            raise ValueError("Шаг по времени должен быть положительным")
+        if t_end <= t_start:
+            raise ValueError("Конечное время должно быть больше начального")
+        if chunk_size < 1:
+            raise ValueError("Размер порции должен быть положительным")
+
+        n_steps = int(np.ceil((t_end - t_start) / dt - 1e-9))
+        times = t_start + dt * np.arange(n_steps + 1)
+
+        if self._solve is None or self._dt != dt:
+            self._factorize(dt)
+        a, b = self._coefficients(dt)
+
+        I = np.zeros(self.N) if I0 is None else np.array(I0, dtype=float)
+        q = np.zeros(self.N) if q0 is None else np.array(q0, dtype=float)
+        Phi = self._external_flux(times[0], external_flux, external_field)
+
+        if output is not None:
+            currents = np.lib.format.open_memmap(output, mode='w+', dtype=float,
+                                                 shape=(n_steps + 1, self.N))
+        else:
+            currents = np.empty((n_steps + 1, self.N))
+
+        chunk = np.empty((min(chunk_size, n_steps + 1), self.N))
+        chunk_start, filled = 0, 0
+
+        def store(I):
+            """Запись тока в порцию, сброс порции при заполнении"""
+            nonlocal chunk_start, filled
+            chunk[filled] = I
+            filled += 1
+            if filled == len(chunk):
+                currents[chunk_start:chunk_start + filled] = chunk
+                chunk_start, filled = chunk_start + filled, 0
+
+        store(I)
+
+        for step in range(1, n_steps + 1):
+            Phi_next = self._external_flux(times[step], external_flux, external_field)
+            # -dPhi/dt интегрируется точно: -(Phi_next - Phi)
+            if self.method == 'trapezoidal':
+                rhs = (self._apply_L_total(I) - a * self.R * I - b / self.C * I
+                       - dt / self.C * q - (Phi_next - Phi))
+                I_next = self._solve(rhs)
+                q = q + a * (I + I_next)
+            else:
+                rhs = self._apply_L_total(I) - dt / self.C * q - (Phi_next - Phi)
+                I_next = self._solve(rhs)
+                q = q + dt * I_next
+            I, Phi = I_next, Phi_next
+            store(I)
+
+        if filled:
+            currents[chunk_start:chunk_start + filled] = chunk[:filled]
+        if output is not None:
+            currents.flush()
+
+        self.charges = q
+        return times, currents
+
+    def __repr__(self):
+        return f"TransientSimulator(rings={self.N}, method={self.method})"
@@ -0,0 +1,186 @@
+"""
+Пакетный запуск расчетов без визуализации.
+
+    python cli.py run job.toml [job2.toml ...] [--summary summary.jsonl]
+    python cli.py serve --socket /tmp/metastructure.sock
+
+Файл задания (TOML или JSON):
+
+    [material]              # параметры CubicStructure
+    grid_x = 2
+    frequency = 1e9
+
+    [solve]
+    method = "direct"       # direct | symmetric | ldlt
+    precision = "double"    # double | mixed
+    workers = 4             # потоки для блоков метода symmetric (необязательно)
+    field = [0, 0, 1]       # однородное внешнее поле B (Тл)
+    mutual_inductances = "M.npy"  # матрица M (обязательно)
+
+    [output]
+    solution = "result.npz"
+
+Для каждого задания в stdout (и в --summary) пишется строка JSON
+с временами этапов и сводкой результата. При precision = "mixed"
+Z собирается в complex64. Команда serve запускает
+сервис решения (Service.SolverService). Тяжелые модули (numpy, scipy,
+plotly) импортируются только при необходимости.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def load_job(path):
+    """Чтение файла задания"""
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    import tomllib
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def validate_job(job):
+    """Проверка задания до начала расчета"""
+    solve_params = job.get("solve", {})
+    if "mutual_inductances" not in solve_params:
+        # MutualInductanceCalculator.mutual_inductance пока не реализован
+        raise ValueError("В задании нужен solve.mutual_inductances: файл .npy с матрицей M "
+                         "(расчет M по геометрии не реализован)")
+    if solve_params.get("method", "direct") not in ("direct", "symmetric", "ldlt"):
+        raise ValueError(f"Неизвестный метод решения: {solve_params['method']}")
+    if solve_params.get("precision", "double") not in ("double", "mixed"):
+        raise ValueError(f"Неизвестная точность: {solve_params['precision']}")
+    workers = solve_params.get("workers")
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        raise ValueError(f"workers должно быть целым числом >= 1: {workers}")
+
+
+def run_job(path):
+    """
+    Построение материала, сборка Z, решение и сохранение результата.
+
+    Returns:
+        dict: сводка задания
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    def lap(name, since):
+        now = time.perf_counter()
+        timings[name] = now - since
+        return now
+
+    job = load_job(path)
+    validate_job(job)
+    base = os.path.dirname(os.path.abspath(path))
+    material_params = job.get("material", {})
+    solve_params = job.get("solve", {})
+    output_params = job.get("output", {})
+
+    t = time.perf_counter()
+    import numpy as np
+    from Metastructure import CubicStructure
+    from Metamaterial import Metamaterial
+    from Solver import ImpedanceMatrixBuilder, Solver
+    from Solution import Solution
+    t = lap("import", t)
+
+    material = Metamaterial(CubicStructure(), **material_params)
+    ring_system = material.ring_system
+    N = material.get_ring_count()
+    t = lap("build", t)
+
+    method = solve_params.get("method", "direct")
+    precision = solve_params.get("precision", "double")
+    packed = method == "ldlt"
+    dtype = np.complex64 if precision == "mixed" else complex
+    M = np.load(os.path.join(base, solve_params["mutual_inductances"]))
+    builder = ImpedanceMatrixBuilder(N, material.resistance, material.inductance,
+                                     material.capacitance, material.omega, dtype=dtype)
+    Z = builder.build_impedance_matrix(M, packed=packed)
+
+    B = np.broadcast_to(np.asarray(solve_params.get("field", [0.0, 0.0, 1.0]), dtype=float), (N, 3))
+    V = ring_system.rings[0].build_external_flux_vector(ring_system, B)
+    t = lap("assemble", t)
+
+    solver = Solver(method=method, precision=precision, workers=solve_params.get("workers"))
+    symmetry = ring_system.get_symmetry() if method == "symmetric" else None
+    currents = solver.solve(Z, V, symmetry=symmetry)
+    t = lap("solve", t)
+
+    solution_path = output_params.get("solution")
+    if solution_path:
+        Solution(currents, frequencies=material.frequency,
+                 parameters=material_params).save(os.path.join(base, solution_path))
+    lap("export", t)
+
+    timings["total"] = time.perf_counter() - start
+    result = {
+        "rings": N,
+        "method": method,
+        "precision": precision,
+        "max_current": float(np.max(np.abs(currents))),
+        "mean_current": float(np.mean(np.abs(currents))),
+    }
+    if solver.info is not None:
+        result.update({key: value for key, value in solver.info.items() if key != "precision"})
+    if symmetry is not None:
+        result["symmetry_order"] = symmetry.order
+
+    return {"job": path, "status": "ok", "timings": timings, "result": result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="Пакетный расчет метаматериалов")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="выполнить файлы заданий")
+    run.add_argument("jobs", nargs="+", help="файлы заданий (.toml или .json)")
+    run.add_argument("--summary", help="файл для сводок (JSON Lines)")
+    serve = commands.add_parser("serve", help="запустить сервис решения")
+    serve.add_argument("--socket", help="путь Unix-сокета (иначе TCP host:port)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--max-entries", type=int, default=8, help="размер LRU-кэша структур")
+    serve.add_argument("--batch-window", type=float, default=0.002, help="окно накопления пакета (с)")
+    serve.add_argument("--workers", type=int, help="число потоков решения")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        import asyncio
+        from Service import SolverService
+        service = SolverService(max_entries=args.max_entries, batch_window=args.batch_window,
+                                workers=args.workers)
+        try:
+            asyncio.run(service.serve(path=args.socket, host=args.host, port=args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    summary = open(args.summary, "a") if args.summary else None
+    failed = 0
+    try:
+        for path in args.jobs:
+            try:
+                record = run_job(path)
+            except Exception as error:
+                failed += 1
+                record = {"job": path, "status": "error",
+                          "error": f"{type(error).__name__}: {error}"}
+            line = json.dumps(record)
+            print(line, flush=True)
+            if summary is not None:
+                summary.write(line + "\n")
+                summary.flush()
+    finally:
+        if summary is not None:
+            summary.close()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+
+def _dipole_coupling(positions, orientations):
+    """Инвариантная относительно поворотов матрица связи (дипольное приближение)"""
+    n = orientations / np.linalg.norm(orientations, axis=1)[:, None]
+    r = positions[None, :, :] - positions[:, None, :]
+    d = np.linalg.norm(r, axis=2)
+    np.fill_diagonal(d, 1.0)
+    r_hat = r / d[:, :, None]
+    ni_r = np.einsum("ik,ijk->ij", n, r_hat)
+    nj_r = np.einsum("jk,ijk->ij", n, r_hat)
+    M = (3 * ni_r * nj_r - n @ n.T) / d ** 3 * 1e-12
+    np.fill_diagonal(M, 0.0)
+    return M
+
+
+def _impedance(material):
+    """Z = (1 + 2j) E + 1j M с дипольной M для материала"""
+    ring_system = material.ring_system
+    M = _dipole_coupling(ring_system.get_positions(), ring_system.get_orientations().astype(float))
+    return np.diag(np.full(len(M), 1 + 2j)) + 1j * M
+
+
+@pytest.fixture
+def dipole_coupling():
+    """Функция (positions, orientations) -> M в дипольном приближении"""
+    return _dipole_coupling
+
+
+@pytest.fixture
+def impedance():
+    """Функция material -> инвариантная относительно группы матрица Z"""
+    return _impedance
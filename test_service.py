@@ -0,0 +1,72 @@
+import asyncio
+import numpy as np
+import pytest
+from Metastructure import CubicStructure
+from Metamaterial import Metamaterial
+from Service import SolverService
+from Solver import ExternalFluxCalculator, ImpedanceMatrixBuilder
+
+PARAMS = {"grid_x": 1, "grid_y": 1, "grid_z": 1}
+
+
+@pytest.fixture
+def mutual_inductances(tmp_path, dipole_coupling):
+    material = Metamaterial(CubicStructure(), **PARAMS)
+    ring_system = material.ring_system
+    path = str(tmp_path / "M.npy")
+    np.save(path, dipole_coupling(ring_system.get_positions(), ring_system.get_orientations().astype(float)))
+    return path
+
+
+def expected_currents(params, M_path, field):
+    material = Metamaterial(CubicStructure(), **params)
+    ring_system = material.ring_system
+    N = material.get_ring_count()
+    builder = ImpedanceMatrixBuilder(N, material.resistance, material.inductance,
+                                     material.capacitance, material.omega)
+    Z = builder.build_impedance_matrix(np.load(M_path))
+    B = np.broadcast_to(np.asarray(field, dtype=float), (N, 3))
+    Phi = ExternalFluxCalculator(ring_system.get_positions(), ring_system.get_orientations()).compute_external_flux(B)
+    return np.linalg.solve(Z, -1j * material.omega * Phi)
+
+
+def test_concurrent_requests_are_batched(mutual_inductances):
+    M_path = mutual_inductances
+    fields = [[0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 1.0, 1.0]]
+
+    async def run():
+        service = SolverService(batch_window=0.05)
+        await service.solve(PARAMS, fields[0], M_path)
+        return await asyncio.gather(*(service.solve(PARAMS, field, M_path) for field in fields))
+
+    results = asyncio.run(run())
+    for field, (currents, cached, batch) in zip(fields, results):
+        assert cached
+        assert batch == len(fields)
+        expected = expected_currents(PARAMS, M_path, field)
+        assert np.max(np.abs(currents - expected)) < 1e-10 * np.max(np.abs(expected))
+
+
+def test_frequency_change_reuses_geometry(mutual_inductances):
+    M_path = mutual_inductances
+    frequencies = [1e9, 2e9, 1e9]
+
+    async def run():
+        service = SolverService()
+        results = []
+        for frequency in frequencies:
+            results.append(await service.solve(dict(PARAMS, frequency=frequency), [0.0, 0.0, 1.0], M_path))
+        return service, results
+
+    service, results = asyncio.run(run())
+    assert len(service.geometries) == 1
+    assert len(service.entries) == 2
+    assert [cached for _, cached, _ in results] == [False, False, True]
+    for frequency, (currents, _, _) in zip(frequencies, results):
+        expected = expected_currents(dict(PARAMS, frequency=frequency), M_path, [0.0, 0.0, 1.0])
+        assert np.max(np.abs(currents - expected)) < 1e-10 * np.max(np.abs(expected))
+
+
+def test_missing_mutual_inductances_is_reported():
+    with pytest.raises(ValueError, match="mutual_inductances"):
+        asyncio.run(SolverService().solve(PARAMS, [0.0, 0.0, 1.0]))
@@ -0,0 +1,141 @@
+import tracemalloc
+import numpy as np
+from Solver import ImpedanceMatrixBuilder, Solver, SymmetricFactorization
+from Solver import pack_symmetric, packed_size, unpack_symmetric
+from Metastructure import CubicStructure
+from Metamaterial import Metamaterial
+
+
+def random_system(N=200, dtype=complex, seed=0):
+    rng = np.random.default_rng(seed)
+    M = rng.normal(size=(N, N)) * 1e-10
+    M = (M + M.T) / 2
+    builder = ImpedanceMatrixBuilder(N, 1.0, 1e-8, 470e-12, 2 * np.pi * 1e9, dtype=dtype)
+    V = rng.normal(size=N) + 1j * rng.normal(size=N)
+    return builder.build_impedance_matrix(M), V
+
+
+def test_mixed_refinement_reaches_double_accuracy():
+    Z, V = random_system()
+    solver = Solver(precision='mixed')
+    I = solver.solve(Z, V)
+    expected = np.linalg.solve(Z, V)
+    assert np.max(np.abs(I - expected)) < 1e-12 * np.max(np.abs(expected))
+    assert solver.info["refinements"] > 0
+    assert not solver.info["fallback"]
+    assert solver.info["backward_error"] < 1e-14
+
+
+def test_mixed_falls_back_when_refinement_stalls():
+    rng = np.random.default_rng(0)
+    N = 100
+    U, _ = np.linalg.qr(rng.normal(size=(N, N)))
+    Z = (U * np.logspace(0, -10, N)) @ U.T + 0j
+    V = rng.normal(size=N) + 0j
+    solver = Solver(precision='mixed')
+    solver.solve(Z, V)
+    assert solver.info["fallback"]
+    assert solver.info["backward_error"] < 1e-14
+
+
+def test_single_precision_storage_is_not_reported_as_double():
+    Z, V = random_system(dtype=np.complex64)
+    assert Z.dtype == np.complex64
+    for precision in ('double', 'mixed'):
+        solver = Solver(precision=precision)
+        solver.solve(Z, V)
+        assert solver.info["backward_error"] >= np.finfo(np.float32).eps / 2
+
+
+def test_symmetric_method_reports_accuracy(impedance):
+    material = Metamaterial(CubicStructure(), grid_x=1, grid_y=1, grid_z=1,
+                            rings_on_corners=False)
+    Z = impedance(material)
+    V = np.ones(len(Z), dtype=complex)
+    solver = Solver('symmetric', precision='mixed')
+    solver.solve(Z, V, symmetry=material.ring_system.get_symmetry())
+    assert solver.info is not None
+    assert solver.info["precision"] == "mixed"
+    assert solver.info["backward_error"] < 1e-14
+
+
+def test_symmetric_info_covers_all_blocks(impedance):
+    material = Metamaterial(CubicStructure(), grid_x=2, grid_y=2, grid_z=2,
+                            rings_on_corners=False)
+    symmetry = material.ring_system.get_symmetry()
+    Z = impedance(material)
+    V = np.random.default_rng(0).normal(size=len(Z)) + 0j
+
+    _, infos = symmetry.solve(Z, V, solver=Solver(precision='mixed'), workers=4, return_info=True)
+    assert len(infos) > 1
+    assert len({id(info) for info in infos}) == len(infos)
+
+    solver = Solver('symmetric', precision='mixed')
+    solver.solve(Z, V, symmetry=symmetry)
+    assert solver.info["refinements"] == sum(info["refinements"] for info in infos)
+
+    # Без уточнений каждый блок переходит на complex128
+    solver = Solver('symmetric', precision='mixed', max_refinements=0)
+    solver.solve(Z, V, symmetry=symmetry)
+    assert solver.info["fallback"] and solver.info["refinements"] == 0
+
+
+def test_ldlt_packed_solve_and_backward_error():
+    Z, V = random_system()
+    ZP = pack_symmetric(Z)
+    expected = np.linalg.solve(Z, V)
+    for precision in ('double', 'mixed'):
+        solver = Solver('ldlt', precision=precision)
+        I = solver.solve(ZP, V)
+        assert np.max(np.abs(I - expected)) < 1e-12 * np.max(np.abs(expected))
+        assert solver.info["precision"] == precision
+        assert solver.info["backward_error"] < 1e-14
+    assert solver.info["refinements"] > 0
+
+
+def test_ldlt_slogdet_with_two_by_two_pivots():
+    rng = np.random.default_rng(3)
+    N = 40
+    # Нулевая диагональ заставляет Бунча-Кауфмана выбирать блоки 2 x 2
+    A = rng.normal(size=(N, N)) + 1j * rng.normal(size=(N, N))
+    Z = A + A.T
+    np.fill_diagonal(Z, 0)
+    factorization = SymmetricFactorization(pack_symmetric(Z))
+    assert np.any(factorization.ipiv < 0)
+
+    sign, logabs = factorization.slogdet()
+    expected_sign, expected_logabs = np.linalg.slogdet(Z)
+    assert np.isclose(logabs, expected_logabs, rtol=1e-10)
+    assert np.isclose(sign, expected_sign, atol=1e-10)
+    assert np.isclose(factorization.determinant(), np.linalg.det(Z), rtol=1e-8)
+
+
+def test_packed_assembly_matches_full():
+    rng = np.random.default_rng(4)
+    N = 30
+    M = rng.normal(size=(N, N))
+    M = (M + M.T) / 2
+    builder = ImpedanceMatrixBuilder(N, 1.0, 1e-8, 470e-12, 2 * np.pi * 1e9)
+    Z = builder.build_impedance_matrix(M)
+    ZP = builder.build_impedance_matrix(pack_symmetric(M), packed=True)
+    assert len(ZP) == packed_size(N)
+    assert np.array_equal(unpack_symmetric(ZP), Z)
+
+
+def test_single_precision_assembly_has_no_double_intermediate():
+    rng = np.random.default_rng(5)
+    N = 1000
+    M = rng.normal(size=(N, N))
+    M = (M + M.T) / 2
+    expected = ImpedanceMatrixBuilder(N, 1.0, 1e-8, 470e-12, 2 * np.pi * 1e9).build_impedance_matrix(M)
+    builder = ImpedanceMatrixBuilder(N, 1.0, 1e-8, 470e-12, 2 * np.pi * 1e9, dtype=np.complex64)
+    for packed, source in ((False, M), (False, pack_symmetric(M)), (True, M)):
+        tracemalloc.start()
+        Z = builder.build_impedance_matrix(source, packed=packed)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert Z.dtype == np.complex64
+        # Пик - сама Z и блок порядка 4 МБ, но не копия в complex128
+        assert peak < Z.nbytes + (5 << 20)
+        Z = unpack_symmetric(Z) if packed else Z
+        assert np.array_equal(Z, expected.astype(np.complex64))
@@ -0,0 +1,99 @@
+import json
+import numpy as np
+from Metastructure import CubicStructure
+from Sweep import ParameterSweep, ResultTable, parameter_grid
+
+CALLS = []
+
+
+def evaluate(material, params, cache):
+    CALLS.append(params)
+    cache["calls"] = cache.get("calls", 0) + 1
+    ring = material.ring_system.rings[0]
+    return {"rings": material.get_ring_count(), "omega_c": ring.omega * ring.C,
+            "reused": cache["calls"] > 1}
+
+
+def failing_evaluate(material, params, cache):
+    if params["capacitance"] == 2e-12:
+        raise RuntimeError("boom")
+    return {"rings": material.get_ring_count()}
+
+
+def configurations():
+    return parameter_grid({"grid_x": [1, 2], "capacitance": [1e-12, 2e-12],
+                           "frequency": [1e6, 2e6]})
+
+
+def test_circuit_changes_reuse_geometry():
+    table = ParameterSweep(CubicStructure(), evaluate, configurations(), workers=1).run()
+    assert len(table) == 8
+    assert np.allclose(table["omega_c"], 2 * np.pi * table["frequency"] * table["capacitance"])
+    # Две геометрии: материал строится дважды, остальные строки переиспользуют его
+    assert table["reused"].sum() == 6
+
+
+def test_resume_after_truncated_line_and_reordering(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    configs = configurations()
+    ParameterSweep(CubicStructure(), evaluate, configs[:4], checkpoint=str(checkpoint),
+                   workers=1).run()
+    with open(checkpoint, "a") as f:
+        f.write('{"index": 99, "ro')
+
+    CALLS.clear()
+    reordered = configs[::-1]
+    table = ParameterSweep(CubicStructure(), evaluate, reordered, checkpoint=str(checkpoint),
+                           workers=1).run()
+    assert len(CALLS) == 4
+    assert all(params in configs[4:] for params in CALLS)
+    assert np.allclose(table["capacitance"], [c["capacitance"] for c in reordered])
+
+    lines = checkpoint.read_text().splitlines()
+    assert len(lines) == 8
+    assert all(json.loads(line)["row"] for line in lines)
+    assert len(ResultTable.read_checkpoint(str(checkpoint))) == 8
+
+
+def test_errors_are_recorded_and_retried(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    table = ParameterSweep(CubicStructure(), failing_evaluate, configurations(),
+                           checkpoint=str(checkpoint), workers=2, max_group_size=2).run()
+    assert len(table) == 8
+    errors = table["error"]
+    assert sum(error is not None for error in errors) == 4
+    assert all(row is None for row in errors[table["capacitance"] == 1e-12])
+    # Строки с ошибкой не попадают в контрольную точку
+    assert len(checkpoint.read_text().splitlines()) == 4
+
+
+def complex_evaluate(material, params, cache):
+    ring = material.ring_system.rings[0]
+    return {"z": complex(ring.R, ring.omega * ring.L), "count": np.int64(material.get_ring_count()),
+            "flag": np.bool_(True), "bad": object() if params["capacitance"] == 2e-12 else None}
+
+
+def test_complex_results_survive_checkpoint(tmp_path):
+    checkpoint = tmp_path / "sweep.jsonl"
+    configs = configurations()
+    fresh = ParameterSweep(CubicStructure(), complex_evaluate, configs,
+                           checkpoint=str(checkpoint), workers=1).run()
+    # Несериализуемый результат превращается в строку с ошибкой
+    assert sum(error is not None for error in fresh["error"]) == 4
+
+    resumed = ParameterSweep(CubicStructure(), complex_evaluate, configs[::2],
+                             checkpoint=str(checkpoint), workers=1).run()
+    assert list(resumed["z"]) == list(fresh["z"][::2])
+    records = ResultTable.read_checkpoint(str(checkpoint))
+    assert len(records) == 4
+    for row in records.values():
+        assert isinstance(row["z"], complex)
+        assert type(row["count"]) is int and row["flag"] is True
+
+
+def test_missing_circuit_parameters_use_defaults():
+    configs = [{"grid_x": 1, "capacitance": 5e-12}, {"grid_x": 1}]
+    table = ParameterSweep(CubicStructure(), evaluate, configs, workers=1).run()
+    default_c = CubicStructure().get_default_parameters()["capacitance"]
+    omega = 2 * np.pi * CubicStructure().get_default_parameters()["frequency"]
+    assert np.allclose(table["omega_c"], [omega * 5e-12, omega * default_c])
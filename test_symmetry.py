@@ -0,0 +1,61 @@
+import numpy as np
+from Metastructure import CubicStructure
+from Metamaterial import Metamaterial
+from Solver import Solver
+
+
+def test_full_cubic_group_detected():
+    material = Metamaterial(CubicStructure(), grid_x=2, grid_y=2, grid_z=2,
+                            rings_on_edges=False, rings_on_corners=False)
+    symmetry = material.ring_system.get_symmetry()
+    assert symmetry.order == 48
+    assert sum(symmetry.get_block_sizes()) == material.get_ring_count()
+
+
+def test_corner_rings_reduce_group():
+    # Кольца в углах ориентированы по (1, 1, 1): остается D3d
+    material = Metamaterial(CubicStructure(), grid_x=2, grid_y=2, grid_z=2)
+    assert material.ring_system.get_symmetry().order == 12
+
+
+def test_symmetric_solve_matches_direct(impedance):
+    material = Metamaterial(CubicStructure(), grid_x=2, grid_y=2, grid_z=2,
+                            rings_on_corners=False)
+    symmetry = material.ring_system.get_symmetry()
+    Z = impedance(material)
+    assert symmetry.is_invariant(Z)
+
+    rng = np.random.default_rng(0)
+    V = rng.normal(size=(len(Z), 2)) + 1j * rng.normal(size=(len(Z), 2))
+    expected = np.linalg.solve(Z, V)
+
+    I = Solver('symmetric').solve(Z, V, symmetry=symmetry)
+    assert np.max(np.abs(I - expected)) < 1e-12 * np.max(np.abs(expected))
+
+    I = symmetry.solve(Z, V[:, 0], workers=4)
+    assert np.max(np.abs(I - expected[:, 0])) < 1e-12 * np.max(np.abs(expected))
+
+
+def test_solver_passes_workers_to_symmetry(monkeypatch, impedance):
+    material = Metamaterial(CubicStructure(), grid_x=1, grid_y=1, grid_z=1,
+                            rings_on_corners=False)
+    symmetry = material.ring_system.get_symmetry()
+    Z = impedance(material)
+    V = np.random.default_rng(1).normal(size=len(Z)) + 0j
+
+    calls = []
+    solve = symmetry.solve
+    monkeypatch.setattr(symmetry, "solve", lambda *args, **kwargs: calls.append(kwargs) or solve(*args, **kwargs))
+    I = Solver('symmetric', workers=4).solve(Z, V, symmetry=symmetry)
+    assert calls[0]["workers"] == 4
+    assert np.allclose(I, np.linalg.solve(Z, V), rtol=1e-12)
+
+
+def test_block_diagonalization_preserves_spectrum(impedance):
+    material = Metamaterial(CubicStructure(), grid_x=1, grid_y=1, grid_z=1,
+                            rings_on_corners=False)
+    symmetry = material.ring_system.get_symmetry()
+    Z = impedance(material)
+    blocks = symmetry.block_diagonalize(Z)
+    det_blocks = np.prod([np.linalg.det(block) for block in blocks])
+    assert np.isclose(det_blocks, np.linalg.det(Z), rtol=1e-10)
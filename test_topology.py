@@ -0,0 +1,84 @@
+import numpy as np
+from Metastructure import CubicStructure
+from Metamaterial import Metamaterial
+from Topology import SITE_EDGE, SITE_FACE, SITE_VERTEX
+
+PARAMS = {"grid_x": 2, "grid_y": 3, "grid_z": 4}
+
+
+def site_centers(material):
+    """Центры мест колец по топологии"""
+    topology = material.topology
+    vertices = material.vertices
+    centers = np.empty((len(topology.ring_site_kind), 3))
+    for kind, table in ((SITE_FACE, topology.faces), (SITE_EDGE, topology.edges)):
+        mask = topology.ring_site_kind == kind
+        centers[mask] = vertices[table[topology.ring_site_index[mask]]].mean(axis=1)
+    mask = topology.ring_site_kind == SITE_VERTEX
+    centers[mask] = vertices[topology.ring_site_index[mask]]
+    return centers
+
+
+def test_edges_and_faces_are_unique():
+    material = Metamaterial(CubicStructure(), **PARAMS)
+    topology = material.topology
+    gx, gy, gz = topology.shape
+    assert material.edges is topology.edges and material.faces is topology.faces
+    assert material.get_edge_count() == gx * (gy + 1) * (gz + 1) + (gx + 1) * gy * (gz + 1) + (gx + 1) * (gy + 1) * gz
+    assert material.get_face_count() == (gx + 1) * gy * gz + gx * (gy + 1) * gz + gx * gy * (gz + 1)
+    assert len(np.unique(np.sort(material.edges, axis=1), axis=0)) == len(material.edges)
+    assert len(np.unique(np.sort(material.faces, axis=1), axis=0)) == len(material.faces)
+
+    # Ребра соединяют соседние вершины
+    lengths = np.linalg.norm(np.diff(material.vertices[material.edges], axis=1)[:, 0], axis=1)
+    assert np.allclose(lengths, material.cube_size * material.unit_size)
+
+
+def test_vertices_come_from_topology(monkeypatch):
+    structure = CubicStructure()
+    vertices, _, _ = structure.calculate_geometry(**PARAMS)
+
+    def duplicated_geometry(**kwargs):
+        raise AssertionError("calculate_geometry не должен вызываться при наличии топологии")
+
+    monkeypatch.setattr(structure, "calculate_geometry", duplicated_geometry)
+    material = Metamaterial(structure, **PARAMS)
+    assert np.array_equal(material.vertices, vertices)
+
+
+def test_incidence_is_consistent():
+    topology = Metamaterial(CubicStructure(), **PARAMS).topology
+    for face in range(topology.n_faces):
+        edges = topology.neighbors(topology.face_edges, face)
+        assert set(topology.edges[edges].ravel()) == set(topology.faces[face])
+        for edge in edges:
+            assert face in topology.neighbors(topology.edge_faces, edge)
+
+    indptr, _ = topology.face_cells
+    cells_per_face = np.diff(indptr)
+    assert set(cells_per_face) == {1, 2}
+    for cell in range(topology.n_cells):
+        faces = topology.neighbors(topology.cell_faces, cell)
+        assert len(np.unique(topology.faces[faces])) == 8
+        assert len(topology.cell_rings(cell)) == 6 + 12 + 8
+
+
+def test_ring_positions_match_sites():
+    material = Metamaterial(CubicStructure(), **PARAMS)
+    assert np.allclose(material.ring_system.get_positions(), site_centers(material))
+
+
+def test_custom_rings_keep_mapping():
+    material = Metamaterial(CubicStructure(), grid_x=1, grid_y=1, grid_z=1, rings_on_edges=False)
+    topology = material.topology
+    count = material.get_ring_count()
+
+    material.add_ring(position=[0.5, 0.5, 0.5], orientation=[0, 0, 1])
+    assert len(topology.ring_site_kind) == count + 1
+    assert topology.ring_site_kind[-1] == -1
+
+    removed_face = topology.ring_site_index[0]
+    material.remove_ring(0)
+    assert len(topology.ring_site_kind) == count
+    assert topology.face_ring[removed_face] == -1
+    assert np.allclose(material.ring_system.get_positions()[:-1], site_centers(material)[:-1])
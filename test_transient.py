@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from Solver import ImpedanceMatrixBuilder
+from Transient import TransientSimulator
+
+N = 12
+R, L, C = 2.0, 1e-8, 1e-9
+OMEGA = 2 * np.pi * 40e6
+PERIOD = 2 * np.pi / OMEGA
+
+
+def coupling(seed=0):
+    rng = np.random.default_rng(seed)
+    M = rng.uniform(-1, 1, (N, N)) * 2e-10
+    M = (M + M.T) / 2
+    np.fill_diagonal(M, 0)
+    return M
+
+
+@pytest.mark.parametrize("kind, method, tol", [
+    ("dense", "trapezoidal", 1e-3),
+    ("sparse", "trapezoidal", 1e-3),
+    ("matrix_free", "trapezoidal", 1e-3),
+    ("dense", "bdf1", 2e-2),
+])
+def test_sinusoidal_drive_reaches_frequency_domain_steady_state(kind, method, tol):
+    M = coupling()
+    Phi0 = np.random.default_rng(1).normal(size=N) * 1e-9
+
+    # Установившийся режим: Z I = -j omega Phi0, Phi(t) = Im(Phi0 e^{j omega t})
+    Z = ImpedanceMatrixBuilder(N, R, L, C, OMEGA).build_impedance_matrix(M)
+    phasor = np.linalg.solve(Z, -1j * OMEGA * Phi0)
+
+    coupling_input = {"dense": M, "sparse": csr_matrix(M), "matrix_free": lambda x: M @ x}[kind]
+    simulator = TransientSimulator(coupling_input, R, L, C, positions=np.zeros((N, 3)),
+                                   method=method)
+    times, currents = simulator.run(30 * PERIOD, PERIOD / 200,
+                                    external_flux=lambda t: Phi0 * np.sin(OMEGA * t))
+    expected = np.imag(phasor * np.exp(1j * OMEGA * times[-1]))
+    assert np.max(np.abs(currents[-1] - expected)) < tol * np.max(np.abs(expected))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_streamed_output_matches_in_memory(tmp_path, chunk_size):
+    simulator = TransientSimulator(coupling(), R, L, C)
+    drive = lambda t: np.full(N, 1e-9 * np.sin(OMEGA * t))
+    _, expected = simulator.run(10 * PERIOD / 50, PERIOD / 50, external_flux=drive)
+    _, currents = simulator.run(10 * PERIOD / 50, PERIOD / 50, external_flux=drive,
+                                output=str(tmp_path / "currents.npy"), chunk_size=chunk_size)
+    assert np.array_equal(np.load(tmp_path / "currents.npy"), expected)
+
+
+def test_rejects_empty_time_range():
+    simulator = TransientSimulator(coupling(), R, L, C)
+    with pytest.raises(ValueError):
+        simulator.run(0.0, 1e-9)
+
+
+def test_external_field_matches_precomputed_flux():
+    rng = np.random.default_rng(2)
+    orientations = rng.normal(size=(N, 3)) * 3
+    normals = orientations / np.linalg.norm(orientations, axis=1)[:, None]
+    B0 = np.array([0.2, -0.1, 1.0]) * 1e-9
+    simulator = TransientSimulator(coupling(), R, L, C, positions=np.zeros((N, 3)),
+                                   orientations=orientations)
+    _, from_field = simulator.run(20 * PERIOD / 50, PERIOD / 50,
+                                  external_field=lambda t: B0 * np.sin(OMEGA * t))
+    _, from_flux = simulator.run(20 * PERIOD / 50, PERIOD / 50,
+                                 external_flux=lambda t: np.pi * normals @ B0 * np.sin(OMEGA * t))
+    assert np.allclose(from_field, from_flux, rtol=1e-12, atol=0)